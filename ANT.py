@@ -28,13 +28,927 @@
 #Get source code at: https://github.com/mengqvist/ANT
 #
 
-from copy import deepcopy
 import dna
+import codon_space
+import precompute
 import protein
 import re
 import math
+from collections import OrderedDict
+from collections import namedtuple
 
+try:
+	import numpy
+except ImportError: #numpy is only needed for the batch functions
+	numpy = None
+
+	
+
+
+
+class ResultCache:
+	'''
+	Class that holds a bounded least-recently-used cache of degenerate codon search results.
+	Results are stored per genetic code, codon exclusion list and target set, 
+	where the target set is an amino acid mask so that the order of the amino acids does not matter.
+	Each result is a list of the best triplet index, the indices of the alternative triplets,
+	the indices of all alternative triplets and the mask of amino acids that can be added without further off-targets 
+	(the last three are None until they have been computed).
+	
+	A single cache is shared by all DegenerateCodon objects: ANT.result_cache
 	
+	Optionally a persistent store (see result_store.py) can be placed behind the cache, 
+	results missing from the cache are then looked up in the store and new results are written to it:
+	ANT.result_cache.setStore(result_store.ResultStore('ant_cache.sqlite'))
+	
+	To see how well the cache works (as a dictionary with hits, misses, store_hits, maxsize and currsize keys):
+	ANT.result_cache.info()
+	
+	To change the number of results kept:
+	ANT.result_cache.resize(maxsize)
+	
+	To empty the cache and reset the counters:
+	ANT.result_cache.clear()
+	'''
+	def __init__(self, maxsize=1024):
+		self.results = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.store_hits = 0
+		self.store = None
+		self.resize(maxsize)
+		
+	def get(self, key):
+		'''
+		Retrieve the result for a (codon space key, amino acid mask) tuple and mark it as most recently used.
+		Output is the result list or None if the result is not cached. The key None is never cached.
+		'''
+		if key is None:
+			self.misses += 1
+			return None
+		result = self.results.pop(key, None)
+		if result is None and self.store is not None:
+			result = self.store.get(key)
+			if result is not None:
+				self.store_hits += 1
+		if result is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.results[key] = result
+		while len(self.results) > self.maxsize:
+			self.results.popitem(last=False)
+		return result
+		
+	def put(self, key, result):
+		'''
+		Store the result for a (codon space key, amino acid mask) tuple, dropping the least recently used results if the cache is full.
+		The result is also written to the persistent store, if there is one. The key None is never cached.
+		'''
+		if key is None:
+			return
+		self.results.pop(key, None)
+		self.results[key] = result
+		while len(self.results) > self.maxsize:
+			self.results.popitem(last=False)
+		if self.store is not None:
+			self.store.put(key, result)
+			
+	def setStore(self, store):
+		'''
+		Place a persistent store, such as a result_store.ResultStore, behind the cache. None removes the store.
+		'''
+		self.store = store
+			
+	def resize(self, maxsize):
+		'''
+		Set how many results may be kept. A maxsize of 0 disables the cache.
+		'''
+		assert type(maxsize) is int and maxsize >= 0, 'Error, the cache size must be a positive integer.'
+		self.maxsize = maxsize
+		while len(self.results) > self.maxsize:
+			self.results.popitem(last=False)
+		
+	def clear(self):
+		'''
+		Remove all results and reset the hit and miss counters. The persistent store is left as it is.
+		'''
+		self.results.clear()
+		self.hits = 0
+		self.misses = 0
+		self.store_hits = 0
+		
+	def info(self):
+		'''
+		Retrieve the cache statistics.
+		Output is a dictionary with the keys hits, misses, store_hits, maxsize and currsize.
+		Hits include the results that were found in the persistent store.
+		'''
+		return {'hits':self.hits, 'misses':self.misses, 'store_hits':self.store_hits, 'maxsize':self.maxsize, 'currsize':len(self.results)}
+
+result_cache = ResultCache()
+
+
+
+#an alternative degenerate codon: the triplet, a list of its off-target amino acids, its number of "real" codons and the fraction of those that are stop codons
+Alternative = namedtuple('Alternative', ['triplet', 'offtarget', 'codons', 'stop_fraction'])
+
+#a mixture of degenerate codons for one position: the triplets, the fraction of each in the mixture, a list of the off-target amino acids of the mixture,
+#its total number of "real" codons and the fraction of those that are stop codons
+Mixture = namedtuple('Mixture', ['triplets', 'ratios', 'offtarget', 'codons', 'stop_fraction'])
+
+#a degenerate codon found by query_triplets(): the triplet, a list of its encoded amino acids, its number of "real" codons, the fraction of those that are stop codons
+#and a dictionary of how many codons encode each amino acid
+Triplet = namedtuple('Triplet', ['triplet', 'encoded', 'codons', 'stop_fraction', 'codons_per_aa'])
+
+#the nucleotides in the order used for nucleotide ratios
+NUCLEOTIDES = 'ACGT'
+
+#custom nucleotide ratios for synthesis: a list of three dictionaries of nucleotide fractions (one per codon position), the expected amino acid distribution
+#as a dictionary, its divergence from the target distribution and the expected fraction of off-target amino acids
+NucleotideMix = namedtuple('NucleotideMix', ['ratios', 'distribution', 'divergence', 'offtarget'])
+
+
+
+answer_files = {} #answer files made by precompute.py, by codon space key
+
+def use_answer_file(path, settings=None):
+	'''
+	Answer the degenerate codon searches for a genetic code from a file made by precompute.py, 
+	so that finding the best triplet is a single lookup.
+	The file is rejected if it was made with another codon table or other codon exclusions than those in settings.txt.
+	'''
+	answer_file = precompute.AnswerFile(path)
+	space = codon_space.get_space(answer_file.key[0], settings)
+	assert answer_file.matches(space), 'Error, the answer file %s was made with another codon table or other codon exclusions than those in settings.txt. Please rebuild it.' % path
+	answer_files[space.key] = answer_file
+
+
+
+def to_codons(codon_list):
+	'''
+	Convert a list of "real" codons to the tuple of required codons used by the codon spaces.
+	A single codon may also be given as a string, None means no required codons.
+	Output is a sorted tuple of upper case three-letter strings.
+	'''
+	if codon_list is None:
+		return ()
+	if type(codon_list) is str:
+		codon_list = [codon_list]
+	codons = tuple(sorted(set([str(s).upper() for s in codon_list])))
+	assert all([re.match('^[GATC]{3}$', s) != None for s in codons]), 'Error, one or more of the codons %s are not valid DNA codons.' % list(codons)
+	return codons
+
+
+def result_key(space, target, required=(), scoring=None):
+	'''
+	Make the result cache key for an amino acid mask, required codons and scoring objective in a codon space.
+	Results with required codons or an objective are kept apart, and are not kept in a result store, by nesting the codon space key.
+	Output is None, which is not cached, for an objective without a key.
+	'''
+	if scoring is not None and scoring.key is None:
+		return None
+	if len(required) == 0 and scoring is None:
+		return (space.key, target)
+	elif scoring is None:
+		return ((space.key, required), target)
+	return ((space.key, required, scoring.key), target)
+
+
+def search_space(space, target, required=(), scoring=None):
+	'''
+	Retrieve the search result for an amino acid mask, a tuple of required codons and a scoring objective (None for the default rule) 
+	in a codon space from the result cache, looking the best triplet up in an answer file or searching for it if it is not there.
+	The output is a list of the best triplet index, the alternative triplet indices, all alternative triplet indices and the possible amino acid mask,
+	where all but the best triplet are None until they have been computed.
+	'''
+	result = result_cache.get(result_key(space, target, required, scoring))
+	if result is None:
+		if scoring is not None:
+			best = scoring.best(space, target, required)
+		elif space.key in answer_files and len(required) == 0:
+			best = answer_files[space.key].lookup(target & space.reachable)[0] #the targets the genetic code cannot encode do not change the best triplet
+		else:
+			best = space.best(target, required)
+		result = [best, None, None, None]
+		result_cache.put(result_key(space, target, required, scoring), result)
+	return result
+
+
+def get_table_space(table, objective='union', settings=None):
+	'''
+	Get the codon space for a genetic code, or the combined codon space for a list of genetic codes and an objective (see DegenerateCodon),
+	for a dna.Settings object (by default the settings file).
+	'''
+	if type(table) is list:
+		table = [int(s) for s in table]
+		assert len(table) != 0, 'Error, at least one genetic code must be given.'
+		assert all([s in dna.GENETIC_CODES for s in table]), 'Error, one or more of the genetic codes %s are invalid.' % table
+		return codon_space.get_combined_space(table, objective, settings)
+	table = int(table)
+	assert table in dna.GENETIC_CODES, 'Error, %s is an invalid genetic code.' % table
+	return codon_space.get_space(table, settings)
+
+
+def solve(must, may=[], exclude=[], table=1, objective='union', required=None, settings=None):
+	'''
+	Find the degenerate codon with the smallest library (fewest "real" codons) for three sets of amino acids: 
+	those that must be encoded, those that may be encoded and those that must not be encoded.
+	Amino acids in none of the sets may be encoded too, but count as off-targets. 
+	Ties are broken by fewest off-target amino acids and then by not encoding a stop codon.
+	The input is three lists of amino acids in single letter code, the genetic code (an integer, or a list of integers and the objective, as for DegenerateCodon)
+	and optionally "real" codons, such as the wild-type codon, that the degenerate codon must include and a dna.Settings object.
+	
+	Output is an Alternative record, where the off-target amino acids are the encoded ones in neither must nor may 
+	(and those in must that are not encoded), or None if no degenerate codon meets the constraints.
+	'''
+	return solve_batch([(must, may, exclude, required)], table, objective, settings)[0]
+
+
+def solve_batch(constraints, table=1, objective='union', settings=None):
+	'''
+	Find the degenerate codon with the smallest library for each of many sets of constraints, for instance every position of a protein, see solve().
+	The input is a list of (must, may, exclude) tuples of lists of amino acids in single letter code, 
+	or (must, may, exclude, required) tuples with the codons the degenerate codon must include, and the genetic code.
+	Output is a list of Alternative records, with None where no degenerate codon meets the constraints.
+	'''
+	space = get_table_space(table, objective, settings)
+	output = []
+	for constraint in constraints:
+		must, may, exclude = constraint[:3]
+		required = to_codons(constraint[3] if len(constraint) > 3 else None)
+		must, may, exclude = [[s.upper() for s in AA_list] for AA_list in (must, may, exclude)]
+		assert all([s in codon_space.AMINO_ACIDS for s in must+may+exclude]), 'Error, one or more of the amino acids %s are not valid.' % (must+may+exclude)
+		must, may, exclude = space.aa_mask(must), space.aa_mask(may), space.aa_mask(exclude)
+		assert must & space.reachable != 0, 'Error, none of the amino acids %s are encoded by genetic code %s.' % (space.aa_list(must), space.table)
+		index = space.constrained(must, may, exclude, required)
+		if index is None:
+			output.append(None)
+		else:
+			output.append(Alternative(codon_space.index_triplet(index), sorted(space.aa_list(space.offtarget(index, must) & ~may)), space.codon_count[index], float(space.stop_count[index])/space.codon_count[index]))
+	return output
+
+
+def query_triplets(encodes=[], excludes=[], within=None, min_codons=1, max_codons=64, aa_codons=None, required=None, order=('codons',), limit=None, table=1, settings=None):
+	'''
+	Find all degenerate codons of a genetic code that meet a set of conditions, sorted, for instance all that encode at least A, S and T, 
+	no stop codon and at most 8 "real" codons, ordered by number of codons. Like DegenerateCodon for a given codon this looks at what all 
+	the "real" codons translate to, but the conditions are checked on sets of triplets kept for each genetic code (see codon_space.CodonSpace.query()),
+	so a query takes milliseconds instead of evaluating 3375 degenerate codons one by one.
+	The input is a list of amino acids in single letter code that must all be encoded, a list of those that must not be encoded and, unless it is None,
+	a list of the only ones that may be encoded; the lowest and highest number of "real" codons; a dictionary with amino acid keys and as values
+	the number of codons for that amino acid or a (lowest, highest) tuple; "real" codons that must be included; a list of sort keys
+	('codons', 'encoded', 'stops' or 'index', each prefixed with a '-' for descending order); the largest number of results, or None for all of them;
+	the genetic code (an integer) and a dna.Settings object.
+	Output is a list of Triplet records.
+	'''
+	assert type(table) is not list, 'Error, queries are made for one genetic code at a time.'
+	space = get_table_space(table, settings=settings)
+	AA_lists = [encodes, excludes] + ([] if within is None else [within]) + [(aa_codons or {}).keys()]
+	assert all([s.upper() in codon_space.AMINO_ACIDS for AA_list in AA_lists for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_lists
+	counts = {}
+	for aa, count in (aa_codons or {}).items():
+		if type(count) is int:
+			count = (count, count)
+		counts[space.letters.index(aa.upper())] = tuple(count)
+	within = None if within is None else space.aa_mask([s.upper() for s in within])
+	indices = space.query(space.aa_mask([s.upper() for s in encodes]), space.aa_mask([s.upper() for s in excludes]), within, min_codons, max_codons, counts, to_codons(required), tuple(order))
+	output = []
+	for i in indices[:limit]:
+		per_aa = space.codons_per_aa(i)
+		output.append(Triplet(codon_space.index_triplet(i), sorted(space.aa_list(space.encoded[i])), space.codon_count[i], float(space.stop_count[i])/space.codon_count[i], 
+								dict([(aa, per_aa[a]) for a, aa in enumerate(space.alphabet)])))
+	return output
+
+
+def design_mixtures(AA_list, table=1, max_triplets=3, objective='union', required=None, settings=None):
+	'''
+	Find the best mixtures of at most max_triplets degenerate codons for one position, for target sets that one degenerate codon 
+	cannot encode without off-target amino acids. The best mixtures have the fewest off-target amino acids, then the fewest degenerate codons,
+	then the fewest "real" codons in total, then the fewest stop codons (see codon_space.CodonSpace.mixtures()).
+	Each degenerate codon is mixed in proportion to its number of "real" codons, so that every "real" codon is equally common.
+	The input is a list of amino acids in single letter code, the genetic code (an integer, or a list of integers, where the off-target amino acids
+	are those in any of the genetic codes), optionally "real" codons that one of the degenerate codons must include and a dna.Settings object.
+	Output is a list of all the best mixtures, as Mixture records.
+	'''
+	return design_mixtures_batch([AA_list], table, max_triplets, objective, [required], settings)[0]
+
+
+def design_mixtures_batch(targets, table=1, max_triplets=3, objective='union', required=None, settings=None):
+	'''
+	Find the best mixtures of degenerate codons for each of many target sets, for instance every position of a protein, see design_mixtures().
+	The input is a list of lists of amino acids in single letter code, the genetic code and the other options of design_mixtures(), 
+	where the required codons are a list with one element per target set: None, a codon or a list of codons.
+	Output is a list with a list of Mixture records for each target set.
+	'''
+	space = get_table_space(table, objective, settings)
+	assert getattr(space, 'objective', 'union') == 'union', 'Error, mixtures for several genetic codes minimize the off-target amino acids in any of them, use the objective union.'
+	if required is None:
+		required = [None] * len(targets)
+	assert len(required) == len(targets), 'Error, the required codons must be a list with one element per target set.'
+	output = []
+	for AA_list, codons in zip(targets, required):
+		AA_list = [s.upper() for s in AA_list]
+		assert all([s in codon_space.AMINO_ACIDS for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		target = space.aa_mask(AA_list)
+		assert target & space.reachable != 0, 'Error, none of the amino acids %s are encoded by genetic code %s.' % (AA_list, space.table)
+		output.append([to_mixture(space, target, indices) for indices in space.mixtures(target, max_triplets, to_codons(codons))])
+	return output
+
+
+def to_mixture(space, target, indices):
+	'''
+	Make a Mixture record for a mixture of triplets for a target set.
+	The off-target amino acids are those encoded by any of the triplets which are not targets, and the targets which the genetic code cannot encode.
+	The input is a codon space, an amino acid mask and a tuple of triplet indices.
+	'''
+	codons = sum([space.codon_count[i] for i in indices])
+	stops = sum([space.stop_count[i] for i in indices])
+	offtarget = space.offtarget(codon_space.NUM_TRIPLETS-1, target) & target
+	for i in indices:
+		offtarget |= space.encoded[i] & ~target
+	return Mixture([codon_space.index_triplet(i) for i in indices], [float(space.codon_count[i])/codons for i in indices], sorted(space.aa_list(offtarget)), codons, float(stops)/codons)
+
+
+def design_all_tables(input, tables=None, settings=None):
+	'''
+	Find the best degenerate codon for a list of amino acids, or evaluate a degenerate codon, in every genetic code at once.
+	The input is a list of amino acids in single letter code or a three-letter degenerate codon, as for DegenerateCodon, 
+	and optionally a list of genetic codes (all of them by default) and a dna.Settings object (by default the settings file).
+	The input is validated and converted once for all genetic codes.
+	Genetic codes that encode none of the amino acids are left out.
+	
+	Output is a list with one entry for each distinct answer, in the order of the genetic codes, 
+	holding the list of genetic codes that give the answer, the degenerate codon, the target amino acids, 
+	the off-target amino acids and the number of "real" codons.
+	'''
+	if tables is None:
+		tables = dna.GENETIC_CODES
+	tables = [int(s) for s in tables]
+	assert all([s in dna.GENETIC_CODES for s in tables]), 'Error, one or more of the genetic codes %s are invalid.' % tables
+	
+	if len(input) == 3 and type(input) == str: #if string i.e. an degenerate codon
+		index = codon_space.triplet_index(input.upper())
+	elif type(input) == list: #if list, i.e. a list of amino acids to evaluate
+		AA_list = [s.upper() for s in input]
+		assert all([s in codon_space.AMINO_ACIDS for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		index = None
+	else:
+		raise ValueError, 'The input is not valid'
+	
+	groups = OrderedDict()
+	for table, space in zip(tables, codon_space.get_spaces(tables, settings)):
+		if index is not None:
+			answer = (index, tuple(sorted(space.aa_list(space.encoded[index]))), (), space.codon_count[index])
+			groups.setdefault(answer, []).append(table)
+			continue
+		#targets that a genetic code cannot encode, such as unnatural amino acids it lacks, are off-target amino acids in that code
+		target = space.aa_mask(AA_list)
+		if target & space.reachable:
+			best = search_space(space, target)[0]
+			answer = (best, tuple(AA_list), tuple(sorted(space.aa_list(space.offtarget(best, target)))), space.codon_count[best])
+		else:
+			continue
+		groups.setdefault(answer, []).append(table)
+	
+	output = []
+	for (index, target, offtarget, num_codons), group in groups.items():
+		output.append([group, codon_space.index_triplet(index), list(target), list(offtarget), num_codons])
+	return output
+
+
+def all_tables_report(input, tables=None, settings=None):
+	'''
+	Retrieve a report of the degenerate codon in every genetic code, see design_all_tables().
+	Output is a string.
+	'''
+	output = ''
+	for group, triplet, target, offtarget, num_codons in design_all_tables(input, tables, settings):
+		output += 'Genetic codes %s\n' % ', '.join([str(s) for s in group])
+		output += 'Degenerate codon: %s\n' % triplet
+		output += 'Target amino acids: %s\n' % target
+		output += 'Off-target amino acids: %s\n' % offtarget
+		output += 'Library size (number of codons): %s\n\n' % num_codons
+	return output
+
+
+
+_batch_arrays = {} #numpy versions of the codon spaces, by codon space key
+
+def get_batch_arrays(space):
+	'''
+	Get numpy arrays, indexed by triplet index, of the encoded and reachable amino acid masks, the number of codons, 
+	the number of encoded amino acids and the rank of each triplet in the two rankings of a codon space.
+	For scoring objectives there are also matrices with one row per triplet: 'aa_matrix' of the encoded amino acids (one column per amino acid in the alphabet of the codon space),
+	'codon_matrix' of the included "real" codons (one column per codon in codon_space.CODONS) and 'codons_per_aa' of how many codons encode each amino acid,
+	and 'translation', the amino acid of each "real" codon as a matrix with one row per codon.
+	'aa_columns' holds the position of each amino acid of the alphabet in codon_space.AMINO_ACIDS, for picking the weights of an Objective.
+	Output is a dictionary of arrays.
+	'''
+	if space.key not in _batch_arrays:
+		arrays = {}
+		arrays['encoded'] = numpy.array(space.encoded, dtype=numpy.int64)
+		arrays['reach'] = numpy.array(space.reach, dtype=numpy.int64)
+		arrays['codons'] = numpy.array(space.codon_count, dtype=numpy.int64)
+		arrays['size'] = numpy.array([codon_space.popcount(s) for s in space.encoded], dtype=numpy.int64)
+		for penalize_stop in (False, True):
+			rank = numpy.empty(codon_space.NUM_TRIPLETS, dtype=numpy.int64)
+			rank[space.order[penalize_stop]] = numpy.arange(codon_space.NUM_TRIPLETS)
+			arrays['rank', penalize_stop] = rank
+		arrays['triplet'] = numpy.array([codon_space.index_triplet(i) for i in range(codon_space.NUM_TRIPLETS)])
+		arrays['aa_matrix'] = (arrays['encoded'][:,None] >> numpy.arange(len(space.alphabet))[None,:]) & 1 == 1
+		arrays['aa_columns'] = numpy.array([codon_space.AMINO_ACIDS.index(s) for s in space.alphabet])
+		arrays['codon_matrix'] = numpy.array([get_containing_array((s,)) for s in codon_space.CODONS]).T
+		arrays['translation'] = numpy.array([[space.translated[s] >> a & 1 for a in range(len(space.alphabet))] for s in codon_space.CODONS])
+		arrays['codons_per_aa'] = numpy.dot(arrays['codon_matrix'].astype(numpy.int64), arrays['translation'])
+		_batch_arrays[space.key] = arrays
+	return _batch_arrays[space.key]
+
+
+_containing_arrays = {}
+
+def get_containing_array(codons):
+	'''
+	Get a boolean numpy array, indexed by triplet index, of which triplets include all of a tuple of "real" codons, see codon_space.containing().
+	'''
+	if codons not in _containing_arrays:
+		index = numpy.arange(codon_space.NUM_TRIPLETS)
+		output = numpy.ones(codon_space.NUM_TRIPLETS, dtype=bool)
+		for codon in codons:
+			for s, w in zip(codon, codon_space.WEIGHTS):
+				output &= (index//w % 15 + 1) & dna.AmbToMask(s) != 0
+		_containing_arrays[codons] = output
+	return _containing_arrays[codons]
+
+
+class Objective:
+	'''
+	Class for scoring degenerate codons with other rules than the default one. Lower scores are better, ties go to the lowest triplet index.
+	Requires numpy.
+	Pass weights for amino acids being off-target and weights for "real" codons being included when instantiating, 
+	either as dictionaries (amino acids or codons not in them get weight 0) or as arrays in the order of codon_space.AMINO_ACIDS (or codon_space.AA_ORDER, 
+	giving the unnatural amino acids U1 to U9 weight 0) and codon_space.CODONS.
+	The score of a triplet is the sum of the weights of its off-target amino acids and the sum of the weights of its codons.
+	All triplets are scored at once, for one or many target sets, with matrix products.
+	
+	Other objectives can be made by subclassing and overriding score(). Built-in objectives are made by
+	fewest_offtargets() (the default rule), stop_penalty(), avoid_aa() and balanced_codons().
+	Results are cached per objective key. A subclass only gets the key None, which keeps its results out of the cache,
+	unless it sets self.key to something that identifies how it scores, such as its class name and parameters.
+	
+	To use an objective:
+	ANT.DegenerateCodon(['S', 'T', 'A', 'G'], 1, scoring=ANT.stop_penalty(3))
+	'''
+	def __init__(self, aa_weights=None, codon_weights=None, name='weighted'):
+		assert numpy is not None, 'Error, scoring objectives require numpy.'
+		if aa_weights is not None and type(aa_weights) is not dict and len(aa_weights) == len(codon_space.AA_ORDER):
+			aa_weights = list(aa_weights) + [0] * (len(codon_space.AMINO_ACIDS) - len(codon_space.AA_ORDER))
+		self.aa_weights = self.to_weights(aa_weights, codon_space.AMINO_ACIDS)
+		self.codon_weights = self.to_weights(codon_weights, codon_space.CODONS)
+		self.name = name
+		self.space_key = None #the key of the codon space that the weights were made for, None if they suit any codon space
+		if self.__class__ is Objective:
+			self.key = ('Objective', name, tuple(self.aa_weights), tuple(self.codon_weights)) #for caching results per objective
+		else:
+			self.key = None #the weights do not say how a subclass scores
+	
+	
+	def to_weights(self, weights, names):
+		'''
+		Convert a dictionary or array of weights to an array with one weight for each name.
+		'''
+		if weights is None:
+			return numpy.zeros(len(names))
+		if type(weights) is dict:
+			assert all([s.upper() in names for s in weights]), 'Error, the weights are for something else than %s.' % ', '.join(names)
+			weights = dict([(s.upper(), w) for s, w in weights.items()])
+			return numpy.array([weights.get(s, 0) for s in names], dtype=float)
+		weights = numpy.asarray(weights, dtype=float)
+		assert weights.shape == (len(names),), 'Error, there must be %s weights.' % len(names)
+		return weights
+	
+	
+	def score(self, arrays, targets):
+		'''
+		Score every triplet for one or more target sets.
+		The input is the arrays of a codon space (see get_batch_arrays()) and a boolean array with one row per target set and one column per amino acid.
+		Output is an array of scores with one row per target set and one column per triplet.
+		'''
+		encoded = arrays['aa_matrix'].astype(float)
+		targets = targets.astype(float)
+		aa_weights = self.aa_weights[arrays['aa_columns']]
+		#an amino acid is off-target if it is encoded or targeted, but not both
+		offtarget = numpy.dot(encoded, aa_weights)[None,:] + numpy.dot(targets, aa_weights)[:,None] - 2*numpy.dot(targets*aa_weights, encoded.T)
+		return offtarget + numpy.dot(arrays['codon_matrix'], self.codon_weights)[None,:]
+	
+	
+	def covering(self, space, target, required=()):
+		'''
+		Find which triplets cover a target set, and include the required codons, as a boolean array indexed by triplet index.
+		'''
+		assert not isinstance(space, codon_space.CombinedSpace), 'Error, scoring objectives can only be used with a single genetic code.'
+		assert self.space_key is None or self.space_key == space.key, 'Error, the objective %s was made for another genetic code or other codon exclusions.' % self.name
+		arrays = get_batch_arrays(space)
+		output = arrays['reach'] & (target & space.reachable) == target & space.reachable
+		if len(required) != 0:
+			output &= get_containing_array(required)
+		return output
+	
+	
+	def ranked(self, space, target, required=()):
+		'''
+		Order the triplets covering a target set by score.
+		The input is a codon space, an amino acid mask and a tuple of required codons, the output is an array of triplet indices, best first.
+		'''
+		scores = self.score(get_batch_arrays(space), to_bool(target, space))[0]
+		covering = numpy.flatnonzero(self.covering(space, target, required))
+		return covering[numpy.argsort(scores[covering], kind='mergesort')]
+	
+	
+	def best(self, space, target, required=()):
+		'''
+		Find the best triplet for a target set.
+		The input is a codon space, an amino acid mask and a tuple of required codons, the output is a triplet index.
+		'''
+		scores = self.score(get_batch_arrays(space), to_bool(target, space))[0]
+		return int(numpy.where(self.covering(space, target, required), scores, numpy.inf).argmin())
+
+
+
+class BalancedObjective(Objective):
+	'''
+	Objective that prefers degenerate codons with the same number of "real" codons for each target amino acid:
+	fewest off-target amino acids first, then the smallest difference between the most and least frequent target amino acid, then fewest codons.
+	'''
+	def __init__(self):
+		Objective.__init__(self, name='balanced')
+		self.key = ('BalancedObjective', 'balanced')
+	
+	def score(self, arrays, targets):
+		'''
+		Score every triplet for one or more target sets, see Objective.score().
+		'''
+		output = numpy.empty((len(targets), codon_space.NUM_TRIPLETS))
+		for row, target in enumerate(targets): #one target set at a time, to keep the triplet by amino acid arrays small
+			offtarget = (arrays['aa_matrix'] != target[None,:]).sum(axis=1)
+			counts = arrays['codons_per_aa'][:,target]
+			if counts.shape[1] == 0:
+				spread = 0
+			else:
+				spread = counts.max(axis=1) - counts.min(axis=1)
+			output[row] = 10000*offtarget + 100*spread + arrays['codons']
+		return output
+
+
+
+def fewest_offtargets():
+	'''
+	The default rule as an Objective: fewest off-target amino acids, then fewest codons, then no off-target stop codon.
+	The weights make each step outweigh all later ones.
+	'''
+	return avoid_aa({}, name='fewest_offtargets')
+
+
+def stop_penalty(weight=3):
+	'''
+	An Objective like the default rule, but where an off-target stop codon counts as weight off-target amino acids.
+	'''
+	return avoid_aa({'*':weight}, name='stop_penalty')
+
+
+def avoid_aa(weights, name='avoid_aa'):
+	'''
+	An Objective like the default rule, but where some off-target amino acids count as several, e.g. avoid_aa({'C':5, '*':2}).
+	'''
+	aa_weights = dict([(s, 10000*weights.get(s, 1)) for s in codon_space.AMINO_ACIDS])
+	aa_weights['*'] += 1 #the stop codon tie-break
+	return Objective(aa_weights, dict([(s, 10) for s in codon_space.CODONS]), name)
+
+
+def balanced_codons():
+	'''
+	An Objective that prefers an even number of codons for each target amino acid, see BalancedObjective.
+	'''
+	return BalancedObjective()
+
+
+def rare_codons(usage, table=1, threshold=0.2, settings=None):
+	'''
+	An Objective that avoids codons the host organism rarely uses: fewest off-target amino acids, then fewest rare codons, then fewest codons, then no stop codon.
+	A codon is rare when its relative adaptiveness (see codon_usage.CodonUsage.getAdaptiveness()) in the genetic code is below the threshold.
+	The input is a codon_usage.CodonUsage object, the genetic code, the threshold and optionally a dna.Settings object.
+	The objective can only be used with that genetic code and codon exclusions.
+	'''
+	space = codon_space.get_space(table, settings)
+	rare = [w < threshold for w in usage.getAdaptiveness(space)]
+	aa_weights = dict([(s, 1000000) for s in codon_space.AMINO_ACIDS])
+	aa_weights['*'] += 1 #the stop codon tie-break
+	objective = Objective(aa_weights, [10 + 1000*s for s in rare], 'rare_codons %s %s %s' % (usage.name, space.table, threshold))
+	objective.space_key = space.key #which codons are rare depends on the genetic code
+	return objective
+
+
+def usage_distributions(usage, table=1, settings=None):
+	'''
+	Compute the expected amino acid distribution of every triplet when each of its "real" codons is weighted by how often the host organism uses it.
+	Requires numpy.
+	The input is a codon_usage.CodonUsage object, the genetic code and optionally a dna.Settings object.
+	Output is an array with one row per triplet index and one column per amino acid in the alphabet of the genetic code (see codon_space.CodonSpace.alphabet), each row summing to one.
+	'''
+	assert numpy is not None, 'Error, usage_distributions requires numpy.'
+	arrays = get_batch_arrays(codon_space.get_space(table, settings))
+	weighted = numpy.dot(arrays['codon_matrix'] * numpy.array(usage.getFrequencies())[None,:], arrays['translation'])
+	totals = weighted.sum(axis=1)
+	return weighted / numpy.where(totals > 0, totals, 1)[:,None]
+
+
+def ratio_codons(ratios):
+	'''
+	Compute how common each "real" codon is when each codon position is synthesized from a mix of nucleotides, 
+	which is the product of the fractions of its three nucleotides.
+	The input is an array of nucleotide fractions with one row per mix, one row per codon position and one column per nucleotide in NUCLEOTIDES.
+	Output is an array with one row per mix and one column per codon in codon_space.CODONS.
+	'''
+	ordered = ratios[:,:,[NUCLEOTIDES.index(s) for s in 'TCAG']]
+	return (ordered[:,0,:,None,None] * ordered[:,1,None,:,None] * ordered[:,2,None,None,:]).reshape(len(ratios), len(codon_space.CODONS))
+
+
+def ratio_distributions(ratios, table=1, settings=None):
+	'''
+	Compute the expected amino acid distribution of oligonucleotides synthesized with custom nucleotide ratios, 
+	rather than the equal ratios of the IUPAC symbols. Requires numpy.
+	The input is an array of nucleotide fractions, or amounts, with one row per mix, one row per codon position and one column per nucleotide in the order ACGT,
+	the genetic code and optionally a dna.Settings object.
+	Output is an array with one row per mix and one column per amino acid in the alphabet of the genetic code (see codon_space.CodonSpace.alphabet).
+	'''
+	assert numpy is not None, 'Error, ratio_distributions requires numpy.'
+	ratios = numpy.asarray(ratios, dtype=float)
+	assert ratios.ndim == 3 and ratios.shape[1:] == (3, len(NUCLEOTIDES)), 'Error, the nucleotide ratios must have one row per codon position and one column for each of the nucleotides %s.' % NUCLEOTIDES
+	assert (ratios >= 0).all() and (ratios.sum(axis=2) > 0).all(), 'Error, the nucleotide ratios must be positive numbers.'
+	translation = get_batch_arrays(codon_space.get_space(table, settings))['translation']
+	return numpy.dot(ratio_codons(ratios / ratios.sum(axis=2)[:,:,None]), translation)
+
+
+def optimize_ratios(profiles, table=1, iterations=200, starts=3, seed=0, settings=None):
+	'''
+	Find the custom nucleotide ratios for the three codon positions whose expected amino acid distribution is closest to each of many target distributions.
+	Requires numpy.
+	The ratios minimize the Kullback-Leibler divergence of the expected distribution from the target distribution. 
+	This is the divergence within the target amino acids plus -ln(1 - the off-target fraction), so off-target amino acids (and stop codons) are kept rare too.
+
+	The expected distribution is a mixture of the codons, each as common as the product of its nucleotide fractions, 
+	so the ratios are fitted by expectation maximization. Each step splits the target fraction of every amino acid between its codons 
+	in proportion to how common they are, and then sets the ratios of each codon position to the nucleotide fractions of that split.
+	A step is a few array operations for all target distributions at once and never increases the divergence.
+	Since a fraction that is zero stays zero, each target distribution is fitted from several starts and the best fit is kept: 
+	the best degenerate codon for the target amino acids with a little of every nucleotide added, equal ratios, and random ratios.
+	Amino acids that the genetic code cannot encode are dropped from the target distributions.
+
+	The input is an array with one row per target distribution and one column per amino acid, in the order of the alphabet of the genetic code (see codon_space.CodonSpace.alphabet, FLSYCWPHERIMTNKVADQG*U without unnatural amino acids U1 to U9),
+	the genetic code, the number of steps, the number of starts, the seed for the random starts and optionally a dna.Settings object.
+	Output is a dictionary of arrays with one element per target distribution:
+	'ratios' the nucleotide fractions, with one row per codon position and one column per nucleotide in the order ACGT (see NUCLEOTIDES),
+	'distribution' the expected amino acid distribution, 'divergence' its Kullback-Leibler divergence from the target distribution 
+	and 'offtarget' the expected fraction of off-target amino acids.
+	'''
+	assert numpy is not None, 'Error, optimize_ratios requires numpy.'
+	space = codon_space.get_space(table, settings)
+	translation = get_batch_arrays(space)['translation'].astype(float)
+	profiles = to_profiles(profiles, space)
+	target = profiles > 0
+
+	#the starting ratios, each nucleotide of a symbol of the best degenerate codon is bit n of its mask, in the order ACGT
+	triplets = [space.best(int(mask)) for mask in to_masks(target, space)]
+	symbols = numpy.array([[i//w % 15 + 1 for w in codon_space.WEIGHTS] for i in triplets]).reshape(len(profiles), 3)
+	first = ((symbols[:,:,None] >> numpy.arange(len(NUCLEOTIDES))) & 1) + 0.1
+	random_state = numpy.random.RandomState(seed)
+	candidates = [first, numpy.ones(first.shape)] + [random_state.dirichlet(numpy.ones(len(NUCLEOTIDES)), size=(len(profiles), 3)) for s in range(starts-2)]
+
+	output = None
+	for ratios in candidates[:max(starts, 1)]:
+		ratios = ratios / ratios.sum(axis=2)[:,:,None]
+		for step in range(iterations):
+			codons = ratio_codons(ratios)
+			weights = numpy.where(target, profiles / numpy.maximum(numpy.dot(codons, translation), 1e-300), 0)
+			split = (codons * numpy.dot(weights, translation.T)).reshape(len(profiles), 4, 4, 4)
+			ratios = numpy.stack([split.sum(axis=(2, 3)), split.sum(axis=(1, 3)), split.sum(axis=(1, 2))], axis=1)[:,:,['TCAG'.index(s) for s in NUCLEOTIDES]]
+			ratios /= ratios.sum(axis=2)[:,:,None]
+		distribution = numpy.dot(ratio_codons(ratios), translation)
+		divergence = numpy.where(target, profiles * numpy.log(numpy.where(target, profiles, 1) / numpy.maximum(distribution, 1e-300)), 0).sum(axis=1)
+		if output is None:
+			output = {'ratios': ratios, 'distribution': distribution, 'divergence': divergence}
+		else:
+			better = divergence < output['divergence']
+			output['ratios'] = numpy.where(better[:,None,None], ratios, output['ratios'])
+			output['distribution'] = numpy.where(better[:,None], distribution, output['distribution'])
+			output['divergence'] = numpy.where(better, divergence, output['divergence'])
+	output['offtarget'] = numpy.where(target, 0, output['distribution']).sum(axis=1)
+	return output
+
+
+def nucleotide_mix(profile, table=1, iterations=200, starts=3, settings=None):
+	'''
+	Find the custom nucleotide ratios for the three codon positions whose expected amino acid distribution is closest to a target distribution, 
+	see optimize_ratios(). Requires numpy.
+	The input is a dictionary of amino acids in single letter code and their target fractions (or counts), 
+	or a list with one per amino acid in the alphabet of the genetic code (see codon_space.CodonSpace.alphabet), the genetic code, the number of steps,
+	the number of starts and optionally a dna.Settings object.
+	Output is a NucleotideMix record.
+	'''
+	space = codon_space.get_space(table, settings)
+	result = optimize_ratios([to_profile(profile, space)], table, iterations, starts, settings=settings)
+	ratios = [dict(zip(NUCLEOTIDES, [float(f) for f in position])) for position in result['ratios'][0]]
+	distribution = dict([(s, float(f)) for s, f in zip(space.alphabet, result['distribution'][0]) if f > 0])
+	return NucleotideMix(ratios, distribution, float(result['divergence'][0]), float(result['offtarget'][0]))
+
+
+def to_profiles(profiles, space):
+	'''
+	Check and normalize target amino acid distributions, dropping the amino acids that the genetic code of a codon space cannot encode.
+	The input is an array with one row per target distribution and one column per amino acid in the alphabet of the codon space, of fractions or counts.
+	Output is an array of the same shape with rows that sum to one.
+	'''
+	profiles = numpy.array(profiles, dtype=float)
+	assert profiles.ndim == 2 and profiles.shape[1] == len(space.alphabet), 'Error, the target distributions must have one column for each of the amino acids %s.' % space.alphabet
+	assert (profiles >= 0).all(), 'Error, the target distributions must be positive numbers.'
+	profiles *= to_bool(space.reachable, space)[0]
+	totals = profiles.sum(axis=1)
+	assert (totals > 0).all(), 'Error, every target distribution needs an amino acid that genetic code %s encodes.' % space.table
+	return profiles / totals[:,None]
+
+
+def to_profile(profile, space):
+	'''
+	Convert a target amino acid distribution given as a dictionary of amino acids in single letter code and their fractions (or counts),
+	or as a list with one fraction per amino acid in the alphabet of a codon space, to a list.
+	'''
+	if isinstance(profile, dict):
+		profile = dict([(s.upper(), f) for s, f in profile.items()])
+		assert all([s in space.alphabet for s in profile]), 'Error, one or more of the amino acids %s are not valid.' % sorted(profile.keys())
+		return [profile.get(s, 0) for s in space.alphabet]
+	return list(profile)
+
+
+def profile_divergences(profiles, table=1, divergence='kl', pseudocount=0.001, settings=None):
+	'''
+	Score every degenerate triplet against target amino acid distributions, such as the amino acid frequencies of an alignment column or those predicted by a model.
+	Requires numpy.
+	The distribution of a triplet is its number of "real" codons for each amino acid (see DegenerateCodon.getCodonsPerAA()) divided by its number of codons.
+	With divergence 'kl' the score is the Kullback-Leibler divergence of the triplet distribution from the target distribution, in nats.
+	A triplet that lacks one of the target amino acids would then score infinity, so the triplet distributions are first mixed with 
+	a pseudocount fraction of an even distribution over the amino acids that the genetic code encodes.
+	With 'l1' the score is the sum of the absolute differences between the two distributions, from 0 to 2.
+	All triplets are scored against all target distributions with array operations, for 'kl' a single matrix product.
+	
+	The input is an array with one row per target distribution and one column per amino acid, in the order of the alphabet of the genetic code (see codon_space.CodonSpace.alphabet, FLSYCWPHERIMTNKVADQG*U without unnatural amino acids U1 to U9),
+	the genetic code, the divergence, the pseudocount and optionally a dna.Settings object.
+	Amino acids that the genetic code cannot encode are dropped from the target distributions.
+	Output is an array with one row per target distribution and one column per triplet index.
+	'''
+	assert numpy is not None, 'Error, profile_divergences requires numpy.'
+	assert divergence in ('kl', 'l1'), 'Error, %s is not a valid divergence. Use kl or l1.' % divergence
+	assert 0 < pseudocount < 1, 'Error, the pseudocount must be between 0 and 1.'
+	space = codon_space.get_space(table, settings)
+	arrays = get_batch_arrays(space)
+	profiles = to_profiles(profiles, space)
+	distributions = arrays['codons_per_aa'] / arrays['codons'][:,None].astype(float)
+	if divergence == 'l1':
+		output = numpy.zeros((len(profiles), codon_space.NUM_TRIPLETS))
+		for a in range(len(space.alphabet)):
+			output += numpy.abs(profiles[:,a,None] - distributions[None,:,a])
+		return output
+	even = to_bool(space.reachable, space)[0] / float(codon_space.popcount(space.reachable))
+	entropy = (profiles * numpy.log(numpy.where(profiles > 0, profiles, 1))).sum(axis=1)
+	mixed = (1-pseudocount)*distributions + pseudocount*even
+	return entropy[:,None] - numpy.dot(profiles, numpy.log(numpy.where(even > 0, mixed, 1)).T) #the dropped amino acids have no weight
+
+
+def nearest_triplets(profile, table=1, divergence='kl', k=10, pseudocount=0.001, settings=None):
+	'''
+	Find the degenerate triplets whose amino acid distribution is closest to a target distribution, see profile_divergences(). Requires numpy.
+	The input is a dictionary of amino acids in single letter code and their target fractions (or counts), or a list with one per amino acid in the alphabet 
+	of the genetic code (see codon_space.CodonSpace.alphabet), the genetic code, the divergence ('kl' or 'l1'), how many triplets to return (None for all 3375), 
+	the pseudocount and optionally a dna.Settings object.
+	Output is a list of (triplet, divergence) tuples, closest first and then by fewest "real" codons.
+	'''
+	result = nearest_triplets_batch([to_profile(profile, codon_space.get_space(table, settings))], table, divergence, k or codon_space.NUM_TRIPLETS, pseudocount, settings=settings)
+	return [(str(s), float(d)) for s, d in zip(result['triplet'][0], result['divergence'][0])]
+
+
+def nearest_triplets_batch(profiles, table=1, divergence='kl', k=1, pseudocount=0.001, chunk_size=1024, settings=None):
+	'''
+	Find the k degenerate triplets whose amino acid distribution is closest to each of many target distributions, see profile_divergences(). Requires numpy.
+	Ties are broken by fewest "real" codons and then by triplet index. The target distributions are scored chunk_size at a time to limit the memory used.
+	The input is an array with one row per target distribution and one column per amino acid, in the order of the alphabet of the genetic code (see codon_space.CodonSpace.alphabet, FLSYCWPHERIMTNKVADQG*U without unnatural amino acids U1 to U9),
+	the genetic code, the divergence ('kl' or 'l1'), the number of triplets, the pseudocount, the chunk size and optionally a dna.Settings object.
+	Output is a dictionary of arrays with one row per target distribution and k columns: 
+	'index' the triplet indices (see codon_space.py), 'triplet' the degenerate codons as strings and 'divergence' their divergences.
+	'''
+	assert numpy is not None, 'Error, nearest_triplets_batch requires numpy.'
+	assert 1 <= k <= codon_space.NUM_TRIPLETS, 'Error, k must be between 1 and %s.' % codon_space.NUM_TRIPLETS
+	arrays = get_batch_arrays(codon_space.get_space(table, settings))
+	profiles = numpy.asarray(profiles)
+	#a stable sort of the triplets in order of codons, then index, keeps ties in that order
+	order = numpy.argsort(arrays['codons'], kind='mergesort')
+	index = numpy.empty((len(profiles), k), dtype=numpy.int64)
+	scores = numpy.empty((len(profiles), k))
+	for start in range(0, len(profiles), chunk_size):
+		chunk = profile_divergences(profiles[start:start+chunk_size], table, divergence, pseudocount, settings)[:,order]
+		ranked = numpy.argsort(chunk, axis=1, kind='mergesort')[:,:k]
+		index[start:start+chunk_size] = order[ranked]
+		scores[start:start+chunk_size] = numpy.take_along_axis(chunk, ranked, axis=1)
+	return {'index': index, 'triplet': arrays['triplet'][index], 'divergence': scores}
+
+
+def to_bool(mask, space):
+	'''
+	Convert an amino acid mask to a boolean array with one row and one column per amino acid in the alphabet of a codon space, as used by Objective.score().
+	'''
+	return (numpy.array([[mask]], dtype=numpy.int64) >> numpy.arange(len(space.alphabet))) & 1 == 1
+
+
+def to_masks(targets, space):
+	'''
+	Convert target sets for the batch functions to a one-dimensional array of amino acid masks.
+	The input is either a boolean array with one row per target set and one column per amino acid, 
+	in the order of the alphabet of the genetic code (see codon_space.CodonSpace.alphabet, FLSYCWPHERIMTNKVADQG*U without unnatural amino acids U1 to U9), or an array of amino acid masks.
+	'''
+	targets = numpy.asarray(targets)
+	if targets.dtype == bool:
+		assert targets.ndim == 2 and targets.shape[1] == len(space.alphabet), 'Error, a boolean target array must have one column for each of the amino acids %s.' % space.alphabet
+		return (targets.astype(numpy.int64) << numpy.arange(len(space.alphabet))).sum(axis=1)
+	assert targets.ndim == 1 and numpy.issubdtype(targets.dtype, numpy.integer), 'Error, the targets must be a boolean array or a one-dimensional array of amino acid masks.'
+	return targets.astype(numpy.int64)
+
+
+def design_batch(targets, table=1, possible=True, chunk_size=1024, required=None, settings=None, scoring=None):
+	'''
+	Find the best degenerate codon for many target sets at once, giving the same results as DegenerateCodon does for each of them.
+	Requires numpy.
+	The input is either a boolean array with one row per target set and one column per amino acid, 
+	in the order of the alphabet of the genetic code (see codon_space.CodonSpace.alphabet, FLSYCWPHERIMTNKVADQG*U without unnatural amino acids U1 to U9), or an array of amino acid masks.
+	Target sets without any amino acid encoded by the genetic code get triplet index -1.
+	If possible is False the possible amino acids are not computed, which makes the search a single lookup when an answer file is in use.
+	Codons that the degenerate codon must include, such as the wild-type codon of each position, can be given as a list with one element per target set:
+	None, a codon or a list of codons. The codon exclusions and codon table 1001 come from a dna.Settings object, by default the settings file.
+	The best triplets are chosen by the default rule, or by a scoring Objective.
+	
+	Output is a dictionary of arrays with one element per target set:
+	'index' the triplet index (see codon_space.py), 'triplet' the degenerate codon as a string,
+	'offtarget' the off-target amino acid mask, 'codons' the number of "real" codons, 
+	'stop' whether the triplet encodes a stop codon and 'possible' the mask of amino acids that can be added without further off-targets.
+	'''
+	assert numpy is not None, 'Error, design_batch requires numpy.'
+	space = codon_space.get_space(table, settings)
+	arrays = get_batch_arrays(space)
+	masks = to_masks(targets, space)
+	assert scoring is None or scoring.space_key is None or scoring.space_key == space.key, 'Error, the objective %s was made for another genetic code or other codon exclusions.' % scoring.name
+	reachable = masks & space.reachable
+	if required is None:
+		required = [()] * len(masks)
+	else:
+		assert len(required) == len(masks), 'Error, the required codons must be given for each target set.'
+		required = [to_codons(s) for s in required]
+	index = numpy.full(len(masks), -1, dtype=numpy.int64)
+	possible_masks = numpy.zeros(len(masks), dtype=numpy.int64)
+	
+	if space.key in answer_files and possible is False and not any(required) and scoring is None:
+		records = numpy.frombuffer(answer_files[space.key].map, dtype=numpy.dtype([('index', '<u2'), ('offtarget', '<u4'), ('codons', 'u1')]), count=precompute.NUM_MASKS, offset=answer_files[space.key].offset)
+		index[reachable != 0] = records['index'][reachable[reachable != 0]]
+	else:
+		for start in range(0, len(masks), chunk_size):
+			chunk = slice(start, start+chunk_size)
+			covering = (arrays['reach'][None,:] & reachable[chunk,None]) == reachable[chunk,None]
+			for row, codons in enumerate(required[chunk]):
+				if codons:
+					covering[row] &= get_containing_array(codons)
+			
+			#the best triplet is the covering one with the lowest rank, or the lowest score
+			if scoring is None:
+				ranks = numpy.where(masks[chunk,None] & codon_space.STOP_BIT, arrays['rank', False][None,:], arrays['rank', True][None,:])
+				best = numpy.where(covering, ranks, codon_space.NUM_TRIPLETS).argmin(axis=1)
+			else:
+				scores = scoring.score(arrays, (masks[chunk,None] >> numpy.arange(len(space.alphabet))[None,:]) & 1 == 1)
+				best = numpy.where(covering, scores, numpy.inf).argmin(axis=1)
+			index[chunk] = best
+			
+			#an amino acid is possible if a covering triplet with at most one more encoded amino acid than the best one encodes it, see CodonSpace.possible()
+			if possible is True:
+				candidates = covering & (arrays['size'][None,:] <= arrays['size'][best][:,None]+1)
+				possible_masks[chunk] = numpy.bitwise_or.reduce(numpy.where(candidates, arrays['reach'][None,:], 0), axis=1)
+		index[reachable == 0] = -1
+		possible_masks &= ~masks & space.reachable
+		
+	found = index >= 0
+	encoded = numpy.where(found, arrays['encoded'][index], 0)
+	output = {}
+	output['index'] = index
+	output['triplet'] = numpy.where(found, arrays['triplet'][index], '')
+	output['offtarget'] = encoded ^ masks
+	output['codons'] = numpy.where(found, arrays['codons'][index], 0)
+	output['stop'] = encoded & codon_space.STOP_BIT != 0
+	output['possible'] = possible_masks
+	return output
 
 
 
@@ -45,18 +959,29 @@ class DegenerateCodon:
 	Required input is an integer that determines the genetic code to use and either a list of desired amino acids in single letter code 
 	OR a three-letter codon using the IUPAC Nucleotide ambiguity code (G, A, T, C, R, Y, W, S, M, K, H, B, V, D, N).
 	
+	The genetic code may also be a list of integers, to find one degenerate codon for use in all of those genetic codes.
+	The off-target amino acids are then those that are off-target in any of the genetic codes. The objective determines what is minimized:
+	'union' the number of those off-target amino acids, 'worst' the number of off-target amino acids in the genetic code where there are most (see codon_space.CombinedSpace).
+	
+	Optionally, "real" codons that the degenerate codon must include can be given, such as the wild-type codon to keep the parent clone in the library.
+	Only degenerate codons that include all of them are then considered.
+	
+	The default rule for choosing the degenerate codon can be replaced by a scoring Objective, such as stop_penalty(), avoid_aa() or balanced_codons().
+	The alternatives with the same number of off-target amino acids are unaffected.
+	
+	The codon exclusions, codon table 1001 and library coverage come from a dna.Settings object, by default the one read from the settings file (see dna.read_settings()).
+	Objects with different settings can be used side by side, the codon spaces are computed once per settings.
+	
 	
 	The algorithm works as follows:
 	
 	* If a list of amino acids (as single letter code) is passed to the algorithm;
-	All possible regular codons for those amino acids are looked up and returned as a list of lists.
-	All nucleotides for first, second and third position are extracted into separate lists while retaining list structure.
-	Separately, for pos 1, 2 and 3, all degenerate nucleotides that matches at least one nucleotide in each list are found.
-	Every combination of these is then made to generate a set of possible degenerate codons.
-	Each of these are scored by converting back to "real" codons, translating to amino acids and checking against the user-defined amino acid selection.
-	The scoring function retains the degenerate codons which have the fewest off-target amino acids (encoded amino acids that were not chosen by the user).
-	This can be one or several, but they all represent the minimum number of off-target amino acids.
-	The scoring function then goes through the degenerate codons and selects that which encodes the fewest number of "real" codons, to decrease redundancy. 
+	For the chosen genetic code every one of the 15^3 degenerate codons is translated once and stored as a bitmask of encoded amino acids (see codon_space.py).
+	The degenerate codons are also ranked once: by the number of encoded amino acids, then by the number of "real" codons and finally by whether they encode a stop codon.
+	For a given amino acid selection, every degenerate codon encoding all of the selected amino acids has the same number of on-target amino acids, 
+	so the first of them in the ranking has the fewest off-target amino acids (encoded amino acids that were not chosen by the user).
+	If several have the minimum number of off-target amino acids, it is the one which encodes the fewest number of "real" codons, to decrease redundancy. 
+	If there are still more than one which are equivalent, it is one WITHOUT a stop codon.
 		
 	* If an degenerate codon is passed to the algorithm;
 	The first, second and third degenerate nucleotide is converted to their actual nucleotide counterparts.
@@ -82,27 +1007,56 @@ class DegenerateCodon:
 	To get which amino acids can still be chosen without further off-target amino acids (as a list of upper case amino acids in single letter code):	
 	codon_object.getPossible()
 	
+	To get which pairs of amino acids can be chosen together without further off-target amino acids 
+	(as a dictionary with upper case amino acid keys and lists of the amino acids each pairs with as values):
+	codon_object.getPossiblePairs()
+	
+	To get which sets of size amino acids, such as triples, can be chosen together without further off-target amino acids (as a list of lists of upper case amino acids):
+	codon_object.getLookahead(size)
+	
 	To get which genetic code was used for the computation (as an integer):
 	codon_object.getTable()
 	
+	To add or remove one target amino acid, updating the degenerate codon from the current one rather than searching from scratch:
+	codon_object.addTarget(AA)
+	codon_object.removeTarget(AA)
+	
+	To get the "real" codons the degenerate codon was required to include (as a tuple of upper case triplets using GATC code):
+	codon_object.getRequired()
+	
 	To get which "real" codons are encoded by the degenerate triplet (as a list of upper case triplets using GATC code):	
 	codon_object.getCodons()
 	
 	To get how often each amino acid is encoded by the degenerate triplet (as a dictionary with amino acid upper case single letter keys and integer values): 
 	codon_object.getCodonsPerAA()
 	
+	To get the expected fraction of each amino acid when the codons are weighted by the codon usage of a host organism (see codon_usage.py), 
+	as a dictionary with amino acid upper case single letter keys and fractions as values:
+	codon_object.getUsageDistribution(usage)
+	
 	To get which alternative degenerate triples (with the same number of off-target amino acids) might be used (as a list of three-letter strings of upper-case characters):
 	codon_object.getAlternatives()
 	
-	To get an extended list of alternative triplets, and the amino acids they encode (this list is no longer limited to codons with the same number of off-target amino acids):
+	To get the alternative triplets that are Pareto-optimal for the number of off-target amino acids, the number of "real" codons and the fraction of stop codons
+	(as a list of Alternative records, this list is no longer limited to codons with the same number of off-target amino acids):
 	codon_object.getExtendedAlternatives()
 	
+	To go through every alternative triplet best-first, optionally limited to k triplets, max_offtarget off-target amino acids and max_codons "real" codons
+	(as a generator of Alternative records):
+	codon_object.iterAlternatives(k, max_offtarget, max_codons)
+	
+	To get the best mixtures of at most max_triplets degenerate codons for the target amino acids, with their mixing ratios (as a list of Mixture records):
+	codon_object.getMixtures(max_triplets)
+	
 	To get a report containing all the above information plus the library size and screening burden (as a string):
 	codon_object.getReport()
 	'''
 	
-	def __init__(self, input, table=1):
-		self.setTable(table)
+	def __init__(self, input, table=1, objective='union', required=None, settings=None, scoring=None):
+		self.setSettings(settings)
+		self.setScoring(scoring)
+		self.setTable(table, objective)
+		self.setRequired(required)
 		
 		#input can be either a three-nucleotide string or a list of amino acids
 		if len(input) == 3 and type(input) == str: #if string i.e. an degenerate codon
@@ -146,8 +1100,33 @@ class DegenerateCodon:
 		Retrieves a list of amino acids still possible without further off-targets.
 		Output is a list of upper case amino acids in single letter code.
 		'''
+		if self.possible is None:
+			self.setPossible(self.next_steps())
 		return self.possible
 		
+	def getLookahead(self, size=2):
+		'''
+		Retrieves which sets of size amino acids can be added to the targets together without further off-target amino acids.
+		Some of these amino acids may not be possible on their own (see getPossible()), only together with the others of a set.
+		All sets are found in one pass over the degenerate codons covering the current targets.
+		Output is a sorted list of sorted lists of upper case amino acids in single letter code.
+		'''
+		target = self.space.aa_mask(self.getTarget())
+		return sorted([sorted(self.space.aa_list(s)) for s in self.space.compatible(target, self.current_score(), size, self.getRequired())])
+		
+	def getPossiblePairs(self):
+		'''
+		Retrieves which pairs of amino acids can be added to the targets together without further off-target amino acids, as a symmetric matrix.
+		Output is a dictionary with an upper case amino acid key for each amino acid in a pair and lists of the amino acids it pairs with as values.
+		'''
+		if self.possiblepairs is None:
+			output = {}
+			for first, second in self.getLookahead(2):
+				output.setdefault(first, []).append(second)
+				output.setdefault(second, []).append(first)
+			self.possiblepairs = dict([(s, sorted(output[s])) for s in output])
+		return self.possiblepairs
+		
 	def getTriplet(self):
 		'''
 		Retrieves the degenerate codon.
@@ -158,10 +1137,41 @@ class DegenerateCodon:
 	def getTable(self):
 		'''
 		Retrieves which genetic code was used.
-		Output is an integer.
+		Output is an integer, or a list of integers for several genetic codes.
 		'''
 		return self.table
 		
+	def getScoring(self):
+		'''
+		Retrieves the scoring objective used for choosing the degenerate codon.
+		Output is an Objective, or None for the default rule.
+		'''
+		return self.scoring
+		
+	def getSettings(self):
+		'''
+		Retrieves the settings used.
+		Output is a dna.Settings object.
+		'''
+		return self.settings
+		
+	def getRequired(self):
+		'''
+		Retrieves the "real" codons that the degenerate codon must include.
+		Output is a sorted tuple of three-letter strings of ACTG upper case characters.
+		'''
+		return self.required
+		
+	def getMixtures(self, max_triplets=3):
+		'''
+		Retrieves the best mixtures of at most max_triplets degenerate codons for the target amino acids, 
+		which may avoid off-target amino acids that a single degenerate codon has (see design_mixtures()).
+		Output is a list of Mixture records.
+		'''
+		assert getattr(self.space, 'objective', 'union') == 'union', 'Error, mixtures for several genetic codes minimize the off-target amino acids in any of them, use the objective union.'
+		target = self.space.aa_mask(self.getTarget())
+		return [to_mixture(self.space, target, indices) for indices in self.space.mixtures(target, max_triplets, self.getRequired())]
+		
 	def getCodons(self):
 		'''
 		Retrieves a list of all the "real" codons encoded by the degenerate codon.
@@ -174,13 +1184,35 @@ class DegenerateCodon:
 		Retrieves a dictionary specifying how many times each amino acid is coded for by the ambiguous codon.
 		Output is a dictionary with amino acid upper case single letter keys and integer values.
 		'''
-		return protein.count_aa(dna.Translate(''.join(dna.UnAmb(self.getTriplet())), self.getTable()))
+		if self.codonsperaa is None:
+			self.codonsperaa = protein.count_aa(''.join([self.space.translate(s) for s in self.getCodons()]))
+		return self.codonsperaa
+		
+	def getUsageDistribution(self, usage):
+		'''
+		Retrieves the expected fraction of each amino acid when each codon of the degenerate triplet is weighted by how often a host organism uses it.
+		For several genetic codes a codon that translates differently in them has its weight split between the amino acids.
+		The input is a codon_usage.CodonUsage object.
+		Output is a dictionary with amino acid upper case single letter keys and fractions as values.
+		'''
+		output = dict([(s, 0.0) for s in self.space.alphabet])
+		for codon in self.getCodons():
+			translated = self.space.translate(codon)
+			for aa in translated:
+				output[aa] += usage.getFrequency(codon) / len(translated)
+		total = sum(output.values())
+		if total > 0:
+			output = dict([(s, f/total) for s, f in output.items()])
+		return output
 		
 	def getExtendedAlternatives(self):
 		'''
-		To get an extended list of alternative triplets, and the amino acids they encode.
-		This list is no longer limited to codons with the same number of off-target amino acids.	
+		To get an extended list of alternative triplets: those for which no other triplet has as few or fewer off-target amino acids, "real" codons and stop codons (as a fraction), 
+		with fewer of at least one. This list is no longer limited to codons with the same number of off-target amino acids.
+		Output is a list of Alternative records, ordered by number of off-target amino acids, number of codons and stop codon fraction.
 		'''
+		if self.extendedalternatives is None:
+			self.evaluateAlternatives()
 		return self.extendedalternatives
 		
 	def getAlternatives(self):
@@ -189,18 +1221,47 @@ class DegenerateCodon:
 		but may differ in the number of codons per amino acid.
 		Output is a list of degenerate codons as three-letter strings of upper-case characters.
 		'''
+		if self.alternatives is None:
+			self.evaluateAlternatives()
 		return self.alternatives
 	
-	def getReport(self):
+	def iterAlternatives(self, k=None, max_offtarget=None, max_codons=None):
+		'''
+		Go through the alternative triplets for the target amino acids best-first: fewest off-target amino acids, then fewest codons, then no stop codon
+		(or by score if a scoring objective is used).
+		Every triplet encoding the targets is included, so stop early or use the limits: 
+		at most k triplets, with at most max_offtarget off-target amino acids (the objective value for several genetic codes) and at most max_codons "real" codons.
+		Triplets are found as they are asked for, so memory use does not depend on how many there are.
+		Output is a generator of Alternative records.
+		'''
+		space = self.space
+		target = space.aa_mask(self.getTarget())
+		count = 0
+		if self.getScoring() is None:
+			ranked = space.ranked(target, self.getRequired())
+		else:
+			ranked = self.getScoring().ranked(space, target, self.getRequired())
+		for i in ranked:
+			if k is not None and count >= k:
+				return
+			if max_offtarget is not None and space.score(i, target) > max_offtarget:
+				if self.getScoring() is None:
+					return
+				continue
+			if max_codons is not None and space.codon_count[i] > max_codons:
+				continue
+			yield Alternative(space.index_codon(i), sorted(space.aa_list(space.offtarget(i, target))), space.codon_count[i], float(space.stop_count[i])/space.codon_count[i])
+			count += 1
+	
+	def getReport(self, max_alternatives=10, usage=None):
 		'''
 		Retrieve a report containing all available data.
+		At most max_alternatives alternative codons are listed on each line, None lists all of them.
+		If a codon_usage.CodonUsage object is given, the codon usage weighted amino acid distribution is reported 
+		together with how many clones to screen to find every target amino acid with the desired coverage.
 		Output is a string.
 		'''
-		#load data from settings file		
-		temp = dict()
-		execfile('./settings.txt', temp)
-		assert type(temp['library_coverage']) is int, 'Error, the library coverage must be an integer between 1 and 99. Please review the settings.txt file.'
-		assert 1 <= temp['library_coverage'] <= 99, 'Error, the library coverage must be an integer between 1 and 99. Please review the settings.txt file.'
+		settings = self.getSettings()
 
 
 		triplet = self.getTriplet()
@@ -208,7 +1269,9 @@ class DegenerateCodon:
 		num_codons = len(codons)
 		output = 'Degenerate codon: %s\n' % triplet
 		output += 'genetic code: %s\n' % self.getTable()
-		output += 'Codons which were excluded from the computation: %s\n' % temp['codons_to_exclude']
+		output += 'Codons which were excluded from the computation: %s\n' % list(settings.codons_to_exclude)
+		if len(self.getRequired()) != 0:
+			output += 'Codons the degenerate codon was required to include: %s\n' % list(self.getRequired())
 		output += 'Real codons encoded by the degenerate codon: %s\n' % codons
 		output += 'Target amino acids: %s\n' % self.getTarget()
 		output += 'Encoded amino acids: %s\n' % self.getEncoded()
@@ -216,9 +1279,17 @@ class DegenerateCodon:
 		output += 'Amino acids that can be added w/o further off-targets: %s\n' % self.getPossible()
 		output += 'Codons for each amino acid: %s\n' % self.getCodonsPerAA()
 		output += 'Library size (number of codons): %s\n' % num_codons
-		output += 'Clones to screen for %s%% library coverage: %s\n' % (temp['library_coverage'], int(-math.log(1-temp['library_coverage']/100.0)/(1/float(num_codons))))    #T=-ln(1-Pi)/Fi
-		output += 'Alternate codons with same number of off-target amino acids: %s\n' % self.getAlternatives()
-		output += 'Alternate codons with same number or more off-target amino acids: %s\n' % self.getExtendedAlternatives()
+		output += 'Clones to screen for %s%% library coverage: %s\n' % (settings.library_coverage, int(-math.log(1-settings.library_coverage/100.0)/(1/float(num_codons))))    #T=-ln(1-Pi)/Fi
+		if usage is not None:
+			distribution = self.getUsageDistribution(usage)
+			rarest = min([distribution.get(s, 0) for s in self.getTarget()])
+			output += 'Amino acid distribution weighted by the codon usage of %s: %s\n' % (usage.name, dict([(s, round(f, 3)) for s, f in distribution.items() if f > 0]))
+			if rarest > 0:
+				output += 'Clones to screen for %s%% coverage of every target amino acid with this codon usage: %s\n' % (settings.library_coverage, int(-math.log(1-settings.library_coverage/100.0)/rarest))    #T=-ln(1-Pi)/Fi
+			else:
+				output += 'Clones to screen for %s%% coverage of every target amino acid with this codon usage: not possible, the organism does not use the codons of a target amino acid\n' % settings.library_coverage
+		output += 'Alternate codons with same number of off-target amino acids: %s\n' % self.limit_list([s[0] for s in self.getAlternatives()], max_alternatives)
+		output += 'Alternate codons with same number or more off-target amino acids, fewer codons or fewer stop codons: %s\n' % self.limit_list(['%s (off-target: %s, codons: %s, stop codons: %.0f%%)' % (s.triplet, s.offtarget, s.codons, 100*s.stop_fraction) for s in self.getExtendedAlternatives()], max_alternatives)
 		return output
 		
 	################################################################
@@ -231,39 +1302,16 @@ class DegenerateCodon:
 	######## Methods NOT intended for direct user interaction ######
 	################################################################
 	
-	def sumupcodons(self, DesiredCodons):
-		'''
-		Takes a list of regular codon lists and does two things; first it splits them up based on the first, second and third position of the triplet,
-		then it checks which nucleotide (degenerate allowed) that matches at least one of the nucleotides from each amino acid.	
-		
-		Example input, where alanine, cysteine and tyrosine are desired is: [['GCT', 'GCC', 'GCA', 'GCG'], ['TGT', 'TGC'], ['TAT', 'TAC']]
-		The objective is to keep the list structure but to make three separate list where each 
-		holds all the unique nucleotides for either the first, second or third base of the codons.
-		The correct output for the first position would be: [['G'], ['T'], ['T']],
-		for the second [['C'], ['G'], ['A']],
-		and for the third [['T', 'C', 'A', 'G'], ['T', 'C'], ['T', 'C']].
-		These lists can then be passed on to another function for finding a nucleotide that matches at least one of the nucleotides from each amino acid.	
-		'''
-		allcodon1 = []
-		allcodon2 = []
-		allcodon3 = []
-		for entry in DesiredCodons:
-			codon1 = []
-			codon2 = []
-			codon3 = []
-			for codon in entry: #splits up the codons of each AA into triplets
-				if codon[0] not in codon1:
-					codon1.extend(codon[0]) #Takes first base in the triplet
-				if codon[1] not in codon2:
-					codon2.extend(codon[1]) #Takes the second base in triplet
-				if codon[2] not in codon3:
-					codon3.extend(codon[2]) #Takes third base in triplet
-			allcodon1.append(codon1) #Adds up all the first bases
-			allcodon2.append(codon2) #Adds up all the second bases
-			allcodon3.append(codon3) #Adds up all the third bases
-		return (allcodon1, allcodon2, allcodon3)
-
-
+	def limit_list(self, items, max_items):
+		'''
+		Join a list of strings for a report, listing at most max_items of them (all of them if max_items is None).
+		Output is a string.
+		'''
+		if max_items is None or len(items) <= max_items:
+			return ', '.join(items)
+		return '%s and %s more' % (', '.join(items[:max_items]), len(items)-max_items)
+	
+	
 	def extra_list_elements(self, list_A, list_B): 
 		'''
 		Method for comparing two lists to find which elements are not present in both.
@@ -278,37 +1326,6 @@ class DegenerateCodon:
 		return not_in_both
 	
 	
-	def flatten_codon_list(self, codon_list):
-		'''
-		Some of the codons are list of lists (happens when the amino acid has codons at different parts of the codon circle).
-		This method flattens the structure one level such that a list of codons remains.
-		'''
-		output = []
-		#print(codon_list)
-		for pos in codon_list:
-			if pos == []:
-				pass
-			else:
-				output_len = len(output)
-				if isinstance(pos[0], str):
-					if output_len == 0:
-						output.append([pos])
-					else:
-						for o in range(output_len):
-							output[o].append(pos)
-						
-				elif isinstance(pos[0], list):
-					if output_len == 0:
-						for p in pos:
-							output.append([p])
-					else:
-						output.extend(deepcopy(output * (len(pos)-1)))
-						for i in range(len(pos)):
-							for j in range(output_len):
-								output[j+i*output_len].append(pos[i])
-		return output
-
-	
 	def find_degenerate(self, AA_list):
 		'''
 		Method for finding an degenerate codon encoding a list of desired amino acids.
@@ -316,120 +1333,171 @@ class DegenerateCodon:
 		To reduce redundancy, the method then goes through all the best codons 
 		(they all have the same number of off-target amino acids) and finds the one with the lowest number of codons. 
 		If there are still more than one which are equivalent, the method then picks one WITHOUT a stop codon.
+		All 15^3 degenerate triplets are considered, so the returned codon is always optimal.
 		
 		The input is a list of upper case amino acids in single-letter code.
-		The valid values are: FLSYCWPHERIMTNKVADQG*		
+		The valid values are: FLSYCWPHERIMTNKVADQG*, U and the unnatural amino acids 1 to 9 (see codon_space.AMINO_ACIDS)		
 		
-		The output is a tuple of the best degenerate codon and the off-target amino acids.
+		The output is a tuple of the best degenerate codon, the off-target amino acids, 
+		the alternative codons with the same number of off-target amino acids and the Pareto-optimal alternative codons.
 		The degenerate codon is a string of three of the following characters: GATCRYWSMKHBVDN
 		The off-target amino acids is a list of upper case amino acids in single letter code.
+		The alternatives are lists holding the codon, the target amino acids and the off-target amino acids of that codon,
+		the Pareto-optimal alternatives are Alternative records.
+		'''
+		best_triplet, best_offtarget = self.find_best(AA_list)
+		alternatives, all_alternatives = self.find_alternatives(AA_list)
+		return best_triplet, best_offtarget, alternatives, all_alternatives
+
+
+	def find_best(self, AA_list):
+		'''
+		Method for finding only the best degenerate codon for a list of desired amino acids, see find_degenerate().
+		The output is a tuple of the best degenerate codon and the off-target amino acids.
 		'''
 		#make sure input is OK
-		assert all([s in 'FLSYCWPHERIMTNKVADQG*U' for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		assert all([s in codon_space.AMINO_ACIDS for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		space = self.space
+		target = space.aa_mask(AA_list)
+		assert target & space.reachable != 0, 'Error, none of the amino acids %s are encoded by genetic code %s.' % (AA_list, self.getTable())
+
+		#the triplets are ranked once per genetic code, so the best one is simply the first that covers the targets
+		best = self.search(target)[0]
+		return space.index_codon(best), sorted(space.aa_list(space.offtarget(best, target)))
+
+
+	def find_alternatives(self, AA_list):
+		'''
+		Method for finding the alternative degenerate codons for a list of desired amino acids, see find_degenerate().
+		The output is a tuple of the alternatives with as few off-target amino acids as the best codon 
+		and the Pareto-optimal alternatives as Alternative records.
+		'''
+		space = self.space
+		target = space.aa_mask(AA_list)
+		result = self.search(target)
 		
-		#get all codons for chosen amino acids
-		regular_triplets = [dna.GetCodons(aa, table=self.getTable(), separate=True, exclude=True) for aa in AA_list]
+		#the alternatives are all the triplets that cover the targets with the best score
+		if result[2] is None:
+			best_score = space.score(result[0], target)
+			result[1] = [i for i in codon_space.bits(space.covering(target, self.getRequired())) if space.score(i, target) == best_score]
+			result[2] = space.pareto(target, self.getRequired())
+			self.store_result(target, result)
+		
+		#the cached triplets are turned into lists holding the amino acids in the order they were given
+		alternatives = [[space.index_codon(i)]+AA_list+sorted(space.aa_list(space.offtarget(i, target))) for i in result[1]] #for saving alternative triplets with as few off-target amino acids as the best one
+		all_alternatives = [Alternative(space.index_codon(i), sorted(space.aa_list(space.offtarget(i, target))), space.codon_count[i], float(space.stop_count[i])/space.codon_count[i]) for i in result[2]]
+		return alternatives, all_alternatives
 
-		#some of the codons are list of lists (happens when the amino acid has codons at different parts of the codon circle)
-		#I need to flatten this into separate lists with which go on further
-		regular_triplets = self.flatten_codon_list(regular_triplets)
 
-		best_score = None
-		all_alternatives = [] #to save the result of all possible triplets
-		for codon_list in regular_triplets:
-			#get all nucleotides for first, second and third position while retaining list structure		
-			first, second, third = self.sumupcodons(codon_list) 
-			
-			#check which degenerate nucleotide can be used to find at least one match in each of the lists
-			possible_triplets = dna.combine([dna.commonNuc(first), dna.commonNuc(second), dna.commonNuc(third)])
-						
-			#now go through them and see which is best
-			for triplet in possible_triplets:
-				#convert the triplet back to a list of real codons 
-				Realcodons = dna.combine([dna.UnAmb(triplet[0]), dna.UnAmb(triplet[1]), dna.UnAmb(triplet[2])]) #condense the different codons for position 1, 2, and 3 to a list of triplets
-			
-				#Check which AA these codons code for
-				ResultingAA = [dna.Translate(codon, table=self.getTable()) for codon in Realcodons]
-
-				#compare which amino acids were desired with the ones resulting from the degenerate codon
-				offtarget = sorted(self.extra_list_elements(AA_list, ResultingAA))
-
-				#add to all options
-				if any([True for s in all_alternatives if s[0] == triplet]) is False:
-					all_alternatives.append([triplet]+AA_list+offtarget)
-				
-				#if there are fewer off-target amino acids with the new codon, keep it
-				if len(offtarget) < best_score or best_score == None:
-					best_score = len(offtarget)
-					good_triplets = []
-					good_triplets.append(triplet)
-				elif len(offtarget) == best_score:
-					good_triplets.append(triplet)
-		
-		#the saved triplets all have the same number of off-target amino acids, now keep the one with the lowest number of codons (to reduce ambiguity)
-		best_triplet = None #for storing best degenerate triplet
-		best_offtarget = None #for storing the off-target AA of the best triplet
-		best_score = None #for storing the length of the off-target list
-		alternatives = [] #for saving alternative triplets and their encoded amino acids
-		for triplet in good_triplets:
-			#convert the triplet back to a list of real codons 
-			Realcodons = dna.combine([dna.UnAmb(triplet[0]), dna.UnAmb(triplet[1]), dna.UnAmb(triplet[2])]) #condense the different codons for position 1, 2, and 3 to a list of triplets
-
-			#Check which AA these codons code for
-			ResultingAA = [dna.Translate(codon, table=self.getTable()) for codon in Realcodons]
-
-			#compare which amino acids were desired with the ones resulting from the degenerate codon
-			offtarget = sorted(self.extra_list_elements(AA_list, ResultingAA))
-				
-			#save alternatives stats
-			if any([True for s in alternatives if s[0] == triplet]) is False:
-					alternatives.append([triplet]+AA_list+offtarget)
-			
-			#save the stats in case there are fewer codons
-			if len(Realcodons) < best_score or best_score == None:
-				
-				#save stats
-				best_score = len(Realcodons)
-				best_triplet = triplet
-				best_offtarget = offtarget
-		
-			#if another codon has same stats as the previous best one, replace the previous codon if it has an off-target stop
-			elif len(Realcodons) == best_score and '*' in best_offtarget: 
-
-				#save stats
-				best_score = len(Realcodons)
-				best_triplet = triplet
-				best_offtarget = offtarget
-			
-			
-		return best_triplet, best_offtarget, alternatives, all_alternatives
+	def search(self, target):
+		'''
+		Retrieve the search result for an amino acid mask from the result cache, searching for the best triplet if it is not there.
+		The output is a list of the best triplet index, the alternative triplet indices and all alternative triplet indices,
+		where the alternatives are None until find_alternatives() has computed them.
+		'''
+		return search_space(self.space, target, self.getRequired(), self.getScoring())
+
+
+	def store_result(self, target, result):
+		'''
+		Put a new or updated search result for an amino acid mask in the result cache.
+		'''
+		result_cache.put(result_key(self.space, target, self.getRequired(), self.getScoring()), result)
 
 	
 		
 	
+	def current_score(self):
+		'''
+		Compute how many off-target amino acids the current degenerate codon has for the targets, 
+		or for several genetic codes the value of the objective (see codon_space.CombinedSpace.score()).
+		Amino acids can be added without further off-targets as long as the best triplet keeps this value or a lower one.
+		The output is an integer.
+		'''
+		return self.space.score(self.space.codon_index(self.getTriplet()), self.space.aa_mask(self.getTarget()))
+
+
 	def next_steps(self):
 		'''
 		Method for finding which other amino acids can be selected without introducing 
 		further (more in number) off-target ones.
+		All unused amino acids are checked in a single pass over the degenerate codons covering the current targets,
+		rather than searching for a new degenerate codon for each of them.
 		The output is a list of upper case amino acids in single letter code.
 		'''
-
-		possibleAA = []
-		targetAA = self.getTarget()
+		target = self.space.aa_mask(self.getTarget())
+		max_offtarget = self.current_score()
 		
-		unusedAA = self.extra_list_elements(targetAA, list('FLSYCWPHERIMTNKVADQG*U'))
-		
-		if len(unusedAA)>0:
-			for AA in unusedAA:
-				temptargetAA = targetAA[:]
-				temptargetAA.append(AA)
-				triplet, offtarget, alternatives, all_options = self.find_degenerate(temptargetAA)
-				if len(offtarget) <= len(self.getOffTarget()):
-					possibleAA.append(AA)
+		#the cached result holds the possible amino acids when allowing as many off-targets as the best triplet has
+		result = self.search(target)
+		if max_offtarget != self.space.score(result[0], target):
+			return sorted(self.space.aa_list(self.space.possible(target, max_offtarget, self.getRequired())))
+		if result[3] is None:
+			result[3] = self.space.possible(target, max_offtarget, self.getRequired())
+			self.store_result(target, result)
+		return sorted(self.space.aa_list(result[3]))
+
 
-		return sorted(possibleAA)
+	def addTarget(self, AA):
+		'''
+		Add one amino acid to the targets, updating the result from the current state instead of searching from scratch.
+		The triplets are ranked once, regardless of the targets, and the best triplet is the first that covers them.
+		So if the current degenerate codon can be used for the added amino acid it stays the best one and only the off-target amino acids change,
+		unless the stop codon is added, which changes the ranking. Otherwise the triplets covering the current targets are kept from the previous step
+		and the best triplet is the first of those that can be used for the added amino acid, found with a single set intersection.
+		If the pairs of possible amino acids were computed (see getPossiblePairs()) and the number of off-target amino acids did not change, 
+		the amino acids that pair with the added one are the new possible ones.
+		With a scoring objective or several genetic codes the best triplet is searched for as usual.
+		The input is an upper case amino acid in single letter code.
+		'''
+		AA = AA.upper()
+		assert len(AA) == 1 and AA in codon_space.AMINO_ACIDS, 'Error, %s is not a valid amino acid.' % AA
+		if AA in self.getTarget():
+			return
+		space = self.space
+		target = space.aa_mask(self.getTarget())
+		added = target | space.aa_mask([AA])
+		key = result_key(space, added, self.getRequired(), self.getScoring())
+		if result_cache.get(key) is not None or self.getScoring() is not None or isinstance(space, codon_space.CombinedSpace) or AA == '*':
+			self.setTarget(self.getTarget() + [AA])
+			return
 
+		#the best triplet for the current targets, which differs from the current one if that was evaluated with evaluateTriplet()
+		best = self.search(target)[0]
+		penalize_stop = target & codon_space.STOP_BIT == 0
+		if self.candidates is None:
+			self.candidates = space.covering_ranked(target, penalize_stop, self.getRequired())
+		if added & space.reachable != target & space.reachable:
+			self.candidates &= space.ranked_cover[penalize_stop][space.letters.index(AA)]
+		if added & space.reachable & ~space.reach[best] != 0:
+			best = space.order[penalize_stop][(self.candidates & -self.candidates).bit_length()-1]
+		
+		possible = None
+		offtarget = sorted(space.aa_list(space.offtarget(best, added)))
+		if self.possiblepairs is not None and len(offtarget) == len(self.getOffTarget()):
+			possible = self.possiblepairs.get(AA, [])
+		result_cache.put(key, [best, None, None, None if possible is None else space.aa_mask(possible)])
 
+		candidates = self.candidates
+		self.target = self.getTarget() + [AA]
+		self.setTriplet(space.index_codon(best))
+		self.setOffTarget(offtarget)
+		self.clearDerived()
+		self.candidates = candidates
+		if possible is not None:
+			self.setPossible(possible)
+		
+	def removeTarget(self, AA):
+		'''
+		Remove one amino acid from the targets. The best triplet for the remaining targets is taken from the result cache when they were targets before,
+		so toggling an amino acid on and off costs a lookup.
+		The input is an upper case amino acid in single letter code.
+		'''
+		AA = AA.upper()
+		assert AA in self.getTarget(), 'Error, %s is not a target amino acid.' % AA
+		assert len(self.getTarget()) > 1, 'Error, the last target amino acid cannot be removed.'
+		self.setTarget([s for s in self.getTarget() if s != AA])
+		
 	def evaluateTriplet(self, amb_codon):
 		'''
 		Evaluate the degenerate codon by computing which amino acids it codes for.
@@ -442,18 +1510,33 @@ class DegenerateCodon:
 		assert m != None, 'Error, the codon %s is not valid. It may only use the chracters GATCRYWSMKHBVDN.' % amb_codon
 		
 		#compute target amino acids and set variables
-		self.target = list(set([dna.Translate(s, self.getTable()) for s in dna.UnAmb(amb_codon)]))
+		self.target = list(set(self.space.aa_list(self.space.encoded[self.space.codon_index(amb_codon)])))
 		self.setTriplet(amb_codon)
 		self.setOffTarget([])
 		
-		#Now let's get the alternative codons
-		triplet, offtarget, alternatives, all_options = self.find_degenerate(self.getTarget())
-		
+		#the alternative codons and the possible amino acids are computed when first asked for
+		self.clearDerived()
+
+
+	def evaluateAlternatives(self):
+		'''
+		Compute the alternative codons for the current target amino acids.
+		'''
+		alternatives, all_options = self.find_alternatives(self.getTarget())
 		self.setAlternatives(alternatives)
-		self.setExtendedAlternatives(sorted(all_options, key=len))
-		
-		#see which other amino acids are possible without further off-target
-		self.setPossible(self.next_steps())
+		self.setExtendedAlternatives(all_options)
+
+
+	def clearDerived(self):
+		'''
+		Forget the alternative codons, possible amino acids (and pairs of them) and codons per amino acid so that they get recomputed on first access.
+		'''
+		self.alternatives = None
+		self.extendedalternatives = None
+		self.possible = None
+		self.possiblepairs = None
+		self.codonsperaa = None
+		self.candidates = None #the ranks of the triplets covering the targets, kept by addTarget()
 
 
 	
@@ -461,23 +1544,20 @@ class DegenerateCodon:
 		'''
 		Set which target amino acids are desired.
 		The input is a list of upper case amino acids in the single-letter code.	
-		The valid values are: FLSYCWPHERIMTNKVADQG*	
+		The valid values are: FLSYCWPHERIMTNKVADQG*, U and the unnatural amino acids 1 to 9 (see codon_space.AMINO_ACIDS)	
 		'''
 		#make sure input is OK
-		assert all([s in 'FLSYCWPHERIMTNKVADQG*U' for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		assert all([s in codon_space.AMINO_ACIDS for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
 		self.target = AA_list
 
 		#compute the single triplet and the off-target AA
-		triplet, offtarget, alternatives, all_options = self.find_degenerate(self.getTarget())
+		triplet, offtarget = self.find_best(self.getTarget())
 		
 		self.setTriplet(triplet)
 		self.setOffTarget(offtarget)
 	
-		self.setAlternatives(alternatives)
-		self.setExtendedAlternatives(sorted(all_options, key=len))
-		
-		#see which other amino acids are possible without further off-target
-		self.setPossible(self.next_steps())
+		#the alternative codons and the possible amino acids are computed when first asked for
+		self.clearDerived()
 		
 
 	
@@ -485,9 +1565,9 @@ class DegenerateCodon:
 		'''
 		Set which amino acids can still be chosen in the next step without further off-target amino acids.
 		The input is a list of upper case amino acids in the single-letter code.	
-		The valid values are: FLSYCWPHERIMTNKVADQG*
+		The valid values are those of setTarget(), and # (see codon_space.FRAMESHIFT) for degenerate quadruplet codons
 		'''
-		assert all([s in 'FLSYCWPHERIMTNKVADQG*U' for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
+		assert all([s in self.space.letters for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list
 		self.offtarget = AA_list
 
 		
@@ -495,9 +1575,9 @@ class DegenerateCodon:
 		'''
 		Set which amino acids can still be chosen in the next step without further off-target amino acids.
 		The input is a list of upper case amino acids in the single-letter code.
-		The valid values are: FLSYCWPHERIMTNKVADQG*
+		The valid values are: FLSYCWPHERIMTNKVADQG*, U and the unnatural amino acids 1 to 9 (see codon_space.AMINO_ACIDS)
 		'''
-		assert all([s in 'FLSYCWPHERIMTNKVADQG*U' for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list		
+		assert all([s in codon_space.AMINO_ACIDS for s in AA_list]), 'Error, one or more of the amino acids %s are not valid.' % AA_list		
 		self.possible = AA_list
 	
 	
@@ -514,7 +1594,7 @@ class DegenerateCodon:
 	
 	def setExtendedAlternatives(self, options_list):
 		'''
-		Sets a list of lists containing alternative codons and all the amino acids encoded by them.
+		Sets a list of Alternative records for the alternative codons.
 		'''
 		self.extendedalternatives = options_list
 		
@@ -528,18 +1608,144 @@ class DegenerateCodon:
 		self.alternatives = alternatives_list
 		
 		
-	def setTable(self, table):
+	def setScoring(self, scoring):
+		'''
+		Set which scoring objective to use for choosing the degenerate codon. Call before setTarget().
+		The input is an Objective, or None for the default rule.
+		'''
+		assert scoring is None or isinstance(scoring, Objective), 'Error, the scoring must be an Objective.'
+		self.scoring = scoring
+		
+		
+	def setSettings(self, settings):
+		'''
+		Set which settings to use. Call before setTable().
+		The input is a dna.Settings object, or None to read the settings file.
+		'''
+		if settings is None:
+			settings = dna.read_settings()
+		assert isinstance(settings, dna.Settings), 'Error, the settings must be a dna.Settings object.'
+		self.settings = settings
+		
+		
+	def setRequired(self, codon_list):
+		'''
+		Set which "real" codons the degenerate codon must include. Call before setTarget().
+		The input is a list of three-letter strings of GATC characters, a single codon as a string, or None for no required codons.
+		'''
+		self.required = to_codons(codon_list)
+		
+		
+	def setTable(self, table, objective='union'):
 		'''
 		Set which genetic code to use.
-		The input is an integer.
+		The input is an integer, or a list of integers and the objective ('union' or 'worst') for finding a codon for several genetic codes.
 		The valid values are: 1, 2, 3, 4, 5, 6, 9, 10, 11, 12, 13, 14, 15, 16, 21, 22, 23, 24, 25 and 1001
 		'''
-		table = int(table)
-		assert table in [1, 2, 3, 4, 5, 6, 9, 10, 11, 12, 13, 14, 15, 16, 21, 22, 23, 24, 25, 1001], 'Error, %s is an invalid genetic code.' % table
-		self.table = table
+		self.space = get_table_space(table, objective, self.getSettings())
+		self.table = self.space.table
 	
 	################################################################		
 
+
+
+class DegenerateQuadruplet(DegenerateCodon):
+	'''
+	Class that holds methods and values for computing the degenerate quadruplet codon (4-nt codon) for a list of amino acids,
+	for genetic codes that are expanded with quadruplet codons read by quadruplet tRNAs (frameshift suppression).
+	Alternatively, the class can evaluate a degenerate quadruplet codon which is provided by the user. 
+	Required input is an integer that determines the genetic code to use and either a list of desired amino acids in single letter code 
+	OR a four-letter codon using the IUPAC Nucleotide ambiguity code (G, A, T, C, R, Y, W, S, M, K, H, B, V, D, N).
+	
+	The quadruplet codons and the amino acids they are assigned to come from a dna.Settings object, 
+	by default the quadruplet_codons in the settings file, and are used together with the triplets of the genetic code.
+	A 4-nt codon without a quadruplet tRNA is read as a triplet, which shifts the reading frame. 
+	It translates to # (see codon_space.FRAMESHIFT), or to a stop if the triplet is a stop codon. # is only ever an off-target amino acid, it cannot be a target or a possible amino acid.
+	
+	All 15^4 degenerate quadruplets are translated once and ranked in the same way as the degenerate triplets (see codon_space.QuadrupletSpace),
+	so the best quadruplet for a list of amino acids is found with a few set intersections.
+	
+	The methods for retrieving information are those of DegenerateCodon, with four-letter codons in place of three-letter ones,
+	for instance codon_object.getTriplet() retrieves the degenerate quadruplet codon.
+	Several genetic codes, required codons, scoring objectives, mixtures and codon usage are not supported.
+	'''
+	
+	def __init__(self, input, table=1, settings=None):
+		self.setSettings(settings)
+		self.setScoring(None)
+		self.setTable(table)
+		self.setRequired(None)
+		
+		#input can be either a four-nucleotide string or a list of amino acids
+		if len(input) == 4 and type(input) == str: #if string i.e. an degenerate quadruplet codon
+			input = input.upper()
+			self.evaluateTriplet(input)
+		elif type(input) == list: #if list, i.e. a list of amino acids to evaluate
+			input = [s.upper() for s in input]
+			self.setTarget(input)
+		else:
+			raise ValueError, 'The input is not valid'
+		return
+	
+	def getCodonsPerAA(self):
+		'''
+		Retrieves a dictionary specifying how many times each amino acid, and the frameshift (#), is coded for by the degenerate quadruplet codon.
+		Output is a dictionary with amino acid upper case single letter keys and integer values.
+		'''
+		if self.codonsperaa is None:
+			translated = [self.space.translate(s) for s in self.getCodons()]
+			self.codonsperaa = dict([(s, translated.count(s)) for s in self.space.alphabet])
+		return self.codonsperaa
+	
+	def getMixtures(self, max_triplets=3):
+		'''
+		Mixtures of degenerate quadruplet codons are not supported.
+		'''
+		raise ValueError, 'Mixtures are not supported for degenerate quadruplet codons.'
+	
+	def getUsageDistribution(self, usage):
+		'''
+		Codon usage is given for triplets, so it is not supported for degenerate quadruplet codons.
+		'''
+		raise ValueError, 'Codon usage is not supported for degenerate quadruplet codons.'
+	
+	def evaluateTriplet(self, amb_codon):
+		'''
+		Evaluate the degenerate quadruplet codon by computing which amino acids it codes for.
+		The input is a string, four letters long and comprising only IUPAC Nucleotide ambiguity code.
+		The valid values is any combination of four of the following: GATCRYWSMKHBVDN		
+		'''
+		self.setTriplet(amb_codon)
+		#the frameshift is only ever an off-target amino acid
+		encoded = self.space.aa_list(self.space.encoded[self.space.codon_index(amb_codon)])
+		self.target = list(set([s for s in encoded if s != codon_space.FRAMESHIFT]))
+		self.setOffTarget([s for s in encoded if s == codon_space.FRAMESHIFT])
+		self.clearDerived()
+	
+	def setTriplet(self, amb_codon):
+		'''
+		Set the degenerate quadruplet codon.
+		The input is a string, four letters long and comprising only IUPAC Nucleotide ambiguity code.
+		The valid values is any combination of four of the following: GATCRYWSMKHBVDN
+		'''
+		assert type(amb_codon) is str and len(amb_codon) == 4, 'Error, the degenerate quadruplet codon must be a string four characters long.'
+		m = re.match('^[GATCRYWSMKHBVDN]{4}$', amb_codon)
+		assert m != None, 'Error, the codon %s is not valid. It may only use the chracters GATCRYWSMKHBVDN.' % amb_codon
+		self.triplet = amb_codon
+	
+	def setTable(self, table, objective='union'):
+		'''
+		Set which genetic code to use for the triplets, the quadruplet codons are the same in all of them.
+		The input is an integer.
+		The valid values are: 1, 2, 3, 4, 5, 6, 9, 10, 11, 12, 13, 14, 15, 16, 21, 22, 23, 24, 25 and 1001
+		'''
+		assert type(table) is not list, 'Error, degenerate quadruplet codons are designed for one genetic code at a time.'
+		table = int(table)
+		assert table in dna.GENETIC_CODES, 'Error, %s is an invalid genetic code.' % table
+		self.space = codon_space.get_quadruplet_space(table, self.getSettings())
+		self.table = self.space.table
+
+
 	
 		
 if __name__ == '__main__':
@@ -549,26 +1755,100 @@ if __name__ == '__main__':
 	parser = argparse.ArgumentParser() 
 	parser.add_argument('--codon')
 	parser.add_argument('--aa', nargs='*')
-	parser.add_argument('--table')
+	parser.add_argument('--table', nargs='+', help='one genetic code, or several to find a codon for use in all of them')
+	parser.add_argument('--objective', default='union', choices=['union', 'worst'], help='what to minimize with several genetic codes')
+	parser.add_argument('--all-tables', action='store_true', help='show the result for every genetic code')
+	parser.add_argument('--may', nargs='*', help='amino acids that may also be encoded, finds the codon with the fewest real codons')
+	parser.add_argument('--exclude', nargs='*', help='amino acids that must not be encoded, finds the codon with the fewest real codons')
+	parser.add_argument('--required', nargs='*', help='real codons the degenerate codon must include, such as the wild-type codon')
+	parser.add_argument('--query', action='store_true', help='list all degenerate codons encoding the amino acids in --aa, none in --exclude and, with --may, no others than those in --aa and --may')
+	parser.add_argument('--min-codons', type=int, default=1, help='for --query, the lowest number of real codons')
+	parser.add_argument('--max-codons', type=int, default=64, help='for --query, the highest number of real codons')
+	parser.add_argument('--aa-codons', nargs='*', help='for --query, numbers of real codons for amino acids, such as L=1 or S=2-4')
+	parser.add_argument('--order', default='codons', help='for --query, comma-separated sort keys: codons, encoded, stops or index, with a - in front for descending order, such as --order=-codons,stops')
+	parser.add_argument('--limit', type=int, help='for --query, the largest number of degenerate codons to list')
+	parser.add_argument('--quadruplet', action='store_true', help='find a degenerate quadruplet (4-nt) codon for the amino acids, with the quadruplet codons in settings.txt')
+	parser.add_argument('--mixture', type=int, help='find the best mixtures of up to this many degenerate codons for the amino acids')
+	parser.add_argument('--cache', help='SQLite file for keeping results between runs')
+	parser.add_argument('--answers', nargs='*', help='answer files made by precompute.py')
 	args = parser.parse_args()
 
 	assert (args.codon != None and args.aa != None) is not True, 'Error, you cannot specify codon and a set of amino acids at the same time.'
 	assert (args.codon == None and args.aa == None) is False, 'Error, you must specify a codon or a set of amino acids.'
 
+	#If a cache file was specified, keep the results there.
+	if args.cache != None:
+		import result_store
+		result_cache.setStore(result_store.ResultStore(args.cache))
+
+	#If answer files were specified, look the answers up there.
+	if args.answers != None:
+		for path in args.answers:
+			use_answer_file(path)
+
 	#If a genetic code was specified, use it. Otherwise use 1.
 	if args.table == None:
 		table = 1
+	elif len(args.table) == 1:
+		table = args.table[0]
 	else:
 		table = args.table
 	
+	#If a query was asked for, list all degenerate codons that meet the conditions.
+	if args.query is True:
+		assert args.aa != None, 'Error, the amino acids that must be encoded are given with --aa, which may be empty.'
+		aa_codons = {}
+		for condition in args.aa_codons or []:
+			m = re.match('^([A-Z*])=([0-9]+)(?:-([0-9]+))?$', condition.upper())
+			assert m != None, 'Error, %s is not a valid number of codons for an amino acid, use for instance L=1 or S=2-4.' % condition
+			aa_codons[m.group(1)] = (int(m.group(2)), int(m.group(3) or m.group(2)))
+		within = None if args.may == None else args.aa + args.may
+		for result in query_triplets(args.aa, args.exclude or [], within, args.min_codons, args.max_codons, aa_codons, args.required, args.order.split(','), args.limit, table):
+			print('Degenerate codon: %s, encoded amino acids: %s, library size (number of codons): %s, stop codon fraction: %.2f' % result[:4])
+		raise SystemExit
+
+	#If amino acids that may or must not be encoded were given, find the smallest library that meets those constraints.
+	if args.may != None or args.exclude != None:
+		assert args.aa != None, 'Error, the amino acids that must be encoded are given with --aa.'
+		result = solve(args.aa, args.may or [], args.exclude or [], table, args.objective, args.required)
+		if result is None:
+			print('No degenerate codon encodes %s without encoding any of %s.' % (args.aa, args.exclude))
+		else:
+			print('Degenerate codon: %s\nOff-target amino acids: %s\nLibrary size (number of codons): %s\nStop codon fraction: %.2f' % result)
+		raise SystemExit
+
+	#If mixtures of degenerate codons were asked for, list the best ones with their mixing ratios.
+	if args.mixture != None:
+		assert args.aa != None, 'Error, the amino acids for a mixture are given with --aa.'
+		for mixture in design_mixtures(args.aa, table, args.mixture, args.objective, args.required):
+			print('Degenerate codons: %s, mixing ratios: %s, off-target amino acids: %s, library size (number of codons): %s, stop codon fraction: %.2f' % 
+					(' + '.join(mixture.triplets), ':'.join(['%.3f' % s for s in mixture.ratios]), mixture.offtarget, mixture.codons, mixture.stop_fraction))
+		raise SystemExit
+
+	#If all genetic codes were asked for, report on each of them.
+	if args.all_tables is True:
+		if args.codon == None:
+			print(all_tables_report(args.aa))
+		else:
+			print(all_tables_report(args.codon))
+		raise SystemExit
+
 	#Now use the codon, or amino acids depending on what was given.
-	if args.codon == None: #If a set of amino acids were specified. 
+	if args.codon == None and args.quadruplet is True: #If a set of amino acids were specified for a quadruplet codon. 
+		AA = args.aa
+		codon_object = DegenerateQuadruplet(AA, table)
+
+	elif args.codon == None: #If a set of amino acids were specified. 
 		AA = args.aa
-		codon_object = DegenerateCodon(AA, table)
+		codon_object = DegenerateCodon(AA, table, args.objective, args.required)
+
+	elif args.aa == None and len(args.codon) == 4: #If a quadruplet codon was specified. 
+		codon = args.codon
+		codon_object = DegenerateQuadruplet(codon, table)
 
 	elif args.aa == None: #If a codon was specified. 
 		codon = args.codon
-		codon_object = DegenerateCodon(codon, table)
+		codon_object = DegenerateCodon(codon, table, args.objective)
 	else:
 		raise ValueError
 
@@ -53,7 +53,9 @@ class CodonView(ANTBaseDrawingClass):
 		self.highlighted = False #a variable for keeping track of whether any object is highlighted
 		self.codon = False
 		self.target = []
+		self.codon_object = None #the degenerate codon for the chosen amino acids, updated one amino acid at a time as they are chosen
 		self.possible = []
+		self.pairs = {} #for each amino acid, those that may be chosen together with it without further off-targets
 		self.offtarget = []
 		self.AA_count = {}
 		self.text_edit_active = False #to keep track of whether text is being edited
@@ -71,6 +73,7 @@ class CodonView(ANTBaseDrawingClass):
 		#set what colors the different fields should have
 		self.target_color = '#CCFF66' #chosen amino acids
 		self.possible_color = '#FFFF66' #amino acid that may still be chosen
+		self.pair_color = '#FFCC33' #amino acid that may be chosen together with the one the mouse pointer hovers over
 		self.offtarget_color = '#FF9966' #off-target amino acids
 		self.nucleotide_color = '#8B835F' #standard nucleotide color
 		self.coding_nucleotide_color = '#4B4424' #for coloring the nucleotides encoded by the degenerate codon
@@ -325,6 +328,9 @@ class CodonView(ANTBaseDrawingClass):
 			elif AA in self.offtarget: #if it is in the off-targets list
 				self.gcdc.SetPen(wx.Pen(colour=self.offtarget_color, width=0))
 				self.gcdc.SetBrush(wx.Brush(self.offtarget_color))
+			elif AA in self.pairs.get(self.highlighted, []): #if current AA may be selected together with the highlighted one without further off-targets
+				self.gcdc.SetPen(wx.Pen(colour=self.pair_color, width=0))
+				self.gcdc.SetBrush(wx.Brush(self.pair_color))
 			elif AA in self.possible: #if current AA is among the ones that may be selected without further off-targets
 				self.gcdc.SetPen(wx.Pen(colour=self.possible_color, width=0))
 				self.gcdc.SetBrush(wx.Brush(self.possible_color))
@@ -518,6 +524,9 @@ class CodonView(ANTBaseDrawingClass):
 				elif current_AA in self.offtarget: #if it is in the off-targets list
 					self.gcdc.SetPen(wx.Pen(colour=self.offtarget_color, width=0))
 					self.gcdc.SetBrush(wx.Brush(self.offtarget_color))
+				elif current_AA in self.pairs.get(self.highlighted, []): #if current AA may be selected together with the highlighted one without further off-targets
+					self.gcdc.SetPen(wx.Pen(colour=self.pair_color, width=0))
+					self.gcdc.SetBrush(wx.Brush(self.pair_color))
 				elif current_AA in self.possible: #if current AA is among the ones that may be selected without further off-targets
 					self.gcdc.SetPen(wx.Pen(colour=self.possible_color, width=0))
 					self.gcdc.SetBrush(wx.Brush(self.possible_color))
@@ -722,6 +731,15 @@ class CodonView(ANTBaseDrawingClass):
 		self.gcdc.DrawRectangle(x, y, width, height)
 		self.gcdc.DrawText(text, x+width*1.2, y)
 
+		#AA possible together with the highlighted one key
+		text = 'Possible with AA under pointer'
+		x = 10
+		y += point_size*1.5
+		self.gcdc.SetBrush(wx.Brush(self.pair_color))
+		self.gcdc.SetPen(wx.Pen(colour='#E6B82E', width=1))
+		self.gcdc.DrawRectangle(x, y, width, height)
+		self.gcdc.DrawText(text, x+width*1.2, y)
+
 		#off-target AA key
 		text = 'Off-target AA'
 		x = 10
@@ -828,25 +846,31 @@ class CodonView(ANTBaseDrawingClass):
 		'''
 		amino_acid = self.HitTest()
 		if amino_acid is not None:
-			if amino_acid not in self.target:
-				self.target.append(amino_acid)
-			elif amino_acid in self.target:
-				self.target.remove(amino_acid)
+			#update the codon object from the previous step rather than searching from scratch
+			if self.codon_object is None:
+				self.codon_object = ANT.DegenerateCodon(self.target + [amino_acid], self.table)
+			elif amino_acid not in self.target:
+				self.codon_object.addTarget(amino_acid)
+			elif len(self.target) > 1:
+				self.codon_object.removeTarget(amino_acid)
 			else:
-				raise ValueError
+				self.codon_object = None
+				self.target = []
 
-		if len(self.target)>0:
-			codon_object = ANT.DegenerateCodon(self.target, self.table)
+		if self.codon_object is not None:
+			codon_object = self.codon_object
 			self.codon = codon_object.getTriplet()
 			self.target = codon_object.getTarget()
 			self.offtarget = codon_object.getOffTarget()
 			self.possible = codon_object.getPossible()
+			self.pairs = codon_object.getPossiblePairs()
 			self.AA_count = codon_object.getCodonsPerAA()
 			self.report = codon_object.getReport()
 		else:
 			self.codon = False
 			self.offtarget = []
 			self.possible = []
+			self.pairs = {}
 		
 		#update drawing
 		self.update_ownUI()
@@ -959,8 +983,10 @@ class CodonButtonWrapper(ANTBaseClass):
 		'''
 		self.codon_view.codon = False
 		self.codon_view.target = []
+		self.codon_view.codon_object = None
 		self.codon_view.offtarget = []
 		self.codon_view.possible = []
+		self.codon_view.pairs = {}
 		self.codon_view.report = ''
 		
 		#update drawing
@@ -975,10 +1001,12 @@ class CodonButtonWrapper(ANTBaseClass):
 		#compute result with new table
 		if len(self.codon_view.target)>0:
 			codon_object = ANT.DegenerateCodon(self.codon_view.target, self.codon_view.table)
+			self.codon_view.codon_object = codon_object
 			self.codon_view.codon = codon_object.getTriplet()
 			self.codon_view.target = codon_object.getTarget()
 			self.codon_view.offtarget = codon_object.getOffTarget()
 			self.codon_view.possible = codon_object.getPossible()
+			self.codon_view.pairs = codon_object.getPossiblePairs()
 			self.codon_view.AA_count = codon_object.getCodonsPerAA()
 			self.codon_view.report = codon_object.getReport()
 		#update drawing
@@ -1008,10 +1036,12 @@ class CodonButtonWrapper(ANTBaseClass):
 		'''
 		#make a codon object with the codon and then set parameters accordingly
 		codon_object = ANT.DegenerateCodon(str(self.input_codon.GetLineText(0)).upper(), self.codon_view.table)
+		self.codon_view.codon_object = codon_object
 		self.codon_view.codon = codon_object.getTriplet()
 		self.codon_view.target = codon_object.getTarget()
 		self.codon_view.offtarget = codon_object.getOffTarget()
 		self.codon_view.possible = codon_object.getPossible()	
+		self.codon_view.pairs = codon_object.getPossiblePairs()
 		self.codon_view.AA_count = codon_object.getCodonsPerAA()
 		self.codon_view.report = codon_object.getReport()
 		
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+
+#The ambiguous nucleotide tool (ANT) is a free and open source tool aimed at
+#generating and analysing degenerate codons to support research in protein engineering, directed evolution and synthetic biology.
+
+#Copyright (C) 2015  Martin Engqvist |
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#LICENSE:
+#This file is part of ANT.
+#
+#ANT is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 3 of the License, or
+#(at your option) any later version.
+#
+#ANT is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU Library General Public License for more details.
+#
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+#Get source code at: https://github.com/mengqvist/ANT
+#
+
+
+
+#This file checks the bitmask search of codon_space.py against the way ANT searched before it:
+#every degenerate triplet is expanded to its "real" codons, which are translated one by one.
+#For random target sets the best degenerate codon, the alternatives and the possible amino acids
+#of DegenerateCodon must then be the same as those found by going through all 3375 triplets.
+#The best triplet is compared by its number of off-target amino acids, number of codons and off-target stop,
+#since triplets that tie on all three may be picked in another order.
+
+import ANT
+import codon_space
+import dna
+import random
+
+
+def translate_triplets(table, settings=None):
+	'''
+	Expand every degenerate triplet to its "real" codons and translate them.
+	Output is a list of (triplet, number of codons, encoded amino acids, amino acids of the codons that are not excluded) tuples, one per triplet index.
+	'''
+	codon_table = dna.CodonTable(table, exclude=True, settings=settings)
+	excluded = codon_table.getExcluded()
+	output = []
+	for i in range(codon_space.NUM_TRIPLETS):
+		triplet = codon_space.index_triplet(i)
+		codons = dna.UnAmb(triplet)
+		encoded = set([dna.Translate(s, table, settings) for s in codons])
+		usable = set([dna.Translate(s, table, settings) for s in codons if s not in excluded])
+		output.append((triplet, len(codons), encoded, usable))
+	return output
+
+
+def brute_force(triplets, AA_list, alphabet):
+	'''
+	Find the best degenerate codon, the alternatives and the possible amino acids for a list of amino acids by going through all triplets.
+	A triplet can be used when each target amino acid that the genetic code has a codon for is translated from one of its codons that is not excluded,
+	its off-target amino acids are those that are encoded or targeted, but not both.
+	The input is the output of translate_triplets(), a list of upper case amino acids and the amino acids that may be added.
+	Output is a tuple of the (number of off-target amino acids, number of codons, off-target stop) of the best triplet,
+	the set of alternative triplets and the sorted list of possible amino acids.
+	'''
+	reachable = triplets[-1][3]
+
+	def search(targets):
+		options = []
+		for triplet, codons, encoded, usable in triplets:
+			if targets & reachable <= usable:
+				offtarget = encoded ^ targets
+				options.append(((len(offtarget), codons, '*' in offtarget), triplet))
+		best = min(options)[0]
+		return best, set([triplet for score, triplet in options if score[0] == best[0]])
+
+	best, alternatives = search(set(AA_list))
+	possible = [s for s in alphabet if s not in AA_list and s in reachable and search(set(AA_list + [s]))[0][0] <= best[0]]
+	return best, alternatives, sorted(possible)
+
+
+def check(table, checks=100, seed=0, settings=None):
+	'''
+	Compare DegenerateCodon with brute_force() for random target sets in one genetic code.
+	The input is the genetic code, the number of target sets, the seed for picking them and a dna.Settings object.
+	'''
+	triplets = translate_triplets(table, settings)
+	alphabet = codon_space.get_space(table, settings).alphabet
+	AAs = [s for s in alphabet if s in triplets[-1][3]]
+	generator = random.Random(seed)
+	for n in range(checks):
+		AA_list = generator.sample(AAs, generator.randint(1, 6))
+		codon_object = ANT.DegenerateCodon(AA_list, table, settings=settings)
+		offtarget = codon_object.getOffTarget()
+		found = ((len(offtarget), len(codon_object.getCodons()), '*' in offtarget), set([s[0] for s in codon_object.getAlternatives()]), codon_object.getPossible())
+		expected = brute_force(triplets, AA_list, alphabet)
+		assert found[0] == expected[0], 'Error, the best degenerate codon for %s in genetic code %s is %s, but %s is better.' % (AA_list, table, codon_object.getTriplet(), sorted(expected[1]))
+		assert found[1] == expected[1], 'Error, the alternatives for %s in genetic code %s are %s, expected %s.' % (AA_list, table, sorted(found[1]), sorted(expected[1]))
+		assert found[2] == expected[2], 'Error, the possible amino acids for %s in genetic code %s are %s, expected %s.' % (AA_list, table, found[2], expected[2])
+
+
+
+if __name__ == '__main__':
+
+	#specify how to parse the arguments
+	import argparse
+	parser = argparse.ArgumentParser(description='Check the degenerate codon search against translating every degenerate triplet.')
+	parser.add_argument('--tables', nargs='*', help='genetic codes to check, all of them if left out')
+	parser.add_argument('--checks', default=100, type=int, help='number of random target sets per genetic code')
+	parser.add_argument('--seed', default=0, type=int)
+	args = parser.parse_args()
+
+	if args.tables == None:
+		tables = dna.GENETIC_CODES
+	else:
+		tables = [int(s) for s in args.tables]
+	for table in tables:
+		check(table, args.checks, args.seed)
+		print('genetic code %s: %s target sets match' % (table, args.checks))
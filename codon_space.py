@@ -0,0 +1,1072 @@
+#!/usr/bin/env python
+
+
+#The ambiguous nucleotide tool (ANT) is a free and open source tool aimed at
+#generating and analysing degenerate codons to support research in protein engineering, directed evolution and synthetic biology.
+
+#Copyright (C) 2015  Martin Engqvist |
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#LICENSE:
+#This file is part of ANT.
+#
+#ANT is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 3 of the License, or
+#(at your option) any later version.
+#
+#ANT is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU Library General Public License for more details.
+#
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+#Get source code at: https://github.com/mengqvist/ANT
+#
+
+
+
+#This file holds a bitmask representation of all degenerate triplets of a genetic code.
+#Every IUPAC symbol is a 4-bit nucleotide mask and every amino acid is one bit of an integer.
+#Sets of triplets are integers as well, where bit i stands for the triplet with index i.
+#Searching for degenerate codons then comes down to integer operations instead of translating real codons.
+
+import dna
+import itertools
+
+
+#the amino acids in the order of their bits, the amino acid at index i is represented by bit i
+#the unnatural amino acids U1 to U9 have the bits above these in every codon space, also when the genetic code has no codons for them (see CodonSpace.letters)
+AA_ORDER = dna.CANONICAL + dna.NONCANONICAL[0]
+STOP_BIT = 1 << AA_ORDER.index('*')
+
+#every amino acid a genetic code can have, with the unnatural amino acids U1 to U9 written as the digits 1 to 9
+AMINO_ACIDS = AA_ORDER + dna.NONCANONICAL[1:]
+
+#the 64 "real" codons, in the order of the codon tables
+CODONS = [b1+b2+b3 for b1 in 'TCAG' for b2 in 'TCAG' for b3 in 'TCAG']
+
+#the number of degenerate triplets and the index weight of the first, second and third position
+NUM_TRIPLETS = 15**3
+WEIGHTS = (225, 15, 1)
+
+#the number of degenerate quadruplets (4-nt codons) and the index weight of each position
+NUM_QUADRUPLETS = 15**4
+QUADRUPLET_WEIGHTS = (3375, 225, 15, 1)
+
+#what a 4-nt codon without a quadruplet tRNA translates to, it is read as a triplet and the reading frame shifts (see QuadrupletSpace)
+FRAMESHIFT = '#'
+
+#the number of bits for the codon count of one amino acid in the packed counts of a triplet (see CodonSpace.aa_codons), a triplet has at most 64 codons
+COUNT_BITS = 7
+
+
+
+def bits(number):
+	'''
+	Find the positions of all set bits in an integer.
+	Output is a list of integers, lowest first.
+	'''
+	binary = bin(number)[:1:-1]
+	output = []
+	i = binary.find('1')
+	while i != -1:
+		output.append(i)
+		i = binary.find('1', i+1)
+	return output
+
+
+def popcount(number):
+	'''
+	Count the number of set bits in an integer.
+	'''
+	return bin(number).count('1')
+
+
+def to_bitset(positions):
+	'''
+	Make an integer with the bits in a list of positions set.
+	'''
+	positions = list(positions)
+	if len(positions) == 0:
+		return 0
+	binary = ['0'] * (max(positions)+1)
+	for i in positions:
+		binary[-i-1] = '1'
+	return int(''.join(binary), 2)
+
+
+def triplet_index(triplet):
+	'''
+	Convert a degenerate triplet to its index in the codon space.
+	The index is (m1-1)*225 + (m2-1)*15 + (m3-1) where m1, m2 and m3 are the nucleotide masks of the three positions.
+	'''
+	assert type(triplet) is str and len(triplet) == 3, 'Error, the degenerate codon must be a string three characters long.'
+	return sum([(dna.AmbToMask(s)-1)*w for s, w in zip(triplet, WEIGHTS)])
+
+
+def index_triplet(index):
+	'''
+	Convert an index in the codon space to the degenerate triplet.
+	Output is a three-letter string of upper case characters.
+	'''
+	assert 0 <= index < NUM_TRIPLETS, 'Error, %s is not a valid triplet index.' % index
+	return ''.join([dna.IUPAC_BY_MASK[index//w % 15] for w in WEIGHTS])
+
+
+def quadruplet_index(quadruplet):
+	'''
+	Convert a degenerate quadruplet to its index in a quadruplet space, in the same way as triplet_index().
+	'''
+	assert type(quadruplet) is str and len(quadruplet) == 4, 'Error, the degenerate quadruplet codon must be a string four characters long.'
+	return sum([(dna.AmbToMask(s)-1)*w for s, w in zip(quadruplet, QUADRUPLET_WEIGHTS)])
+
+
+def index_quadruplet(index):
+	'''
+	Convert an index in a quadruplet space to the degenerate quadruplet.
+	Output is a four-letter string of upper case characters.
+	'''
+	assert 0 <= index < NUM_QUADRUPLETS, 'Error, %s is not a valid quadruplet index.' % index
+	return ''.join([dna.IUPAC_BY_MASK[index//w % 15] for w in QUADRUPLET_WEIGHTS])
+
+
+_containing = {}
+
+def containing(codon):
+	'''
+	Find all triplets whose "real" codons include a codon, i.e. whose symbol at each position includes the nucleotide of the codon.
+	This does not depend on the genetic code, so it is computed once per codon.
+	The input is a three-letter string of GATC characters, the output is a set of triplet indices.
+	'''
+	if codon not in _containing:
+		assert type(codon) is str and len(codon) == 3 and all([s in 'GATC' for s in codon]), 'Error, %s is not a valid DNA codon.' % codon
+		masks = [dna.AmbToMask(s) for s in codon]
+		_containing[codon] = to_bitset([i for i in range(NUM_TRIPLETS) if all([(i//w % 15 + 1) & m for m, w in zip(masks, WEIGHTS)])])
+	return _containing[codon]
+
+
+
+class CodonSpace:
+	'''
+	Class that holds, for one genetic code, the amino acids encoded by each of the 15^3 degenerate triplets.
+	Pass a dna.CodonTable instance made with exclude=True when instantiating.
+
+	The amino acids are those of self.letters, with one bit per amino acid in amino acid masks.
+	self.alphabet is the part of them that the genetic code has columns for in arrays: AA_ORDER followed by the unnatural amino acids
+	up to the highest one of the genetic code (see dna.CodonTable.getAlphabet()).
+	A target amino acid that the genetic code cannot encode is an off-target amino acid of every triplet.
+	For every triplet two amino acid masks are stored.
+	self.encoded holds what all the "real" codons of the triplet translate to.
+	self.reach holds what the codons left after the user-defined exclusions translate to,
+	i.e. which target amino acids the triplet can be used for.
+	self.aa_codons holds the number of "real" codons for each amino acid, packed into one integer with COUNT_BITS bits per amino acid.
+
+	A triplet covers a target set when its reach mask contains every target that the genetic code can encode.
+	Since every amino acid with a codon also has a usable codon the number of off-target amino acids of a covering triplet
+	is its number of encoded amino acids plus a constant that only depends on the target set.
+	The triplets can therefore be ranked once: by number of encoded amino acids, then number of codons, then stop content.
+	The best triplet for any target set is the first covering triplet in that ranking.
+	'''
+	size = NUM_TRIPLETS #the number of degenerate codons, i.e. of bits in a set of triplets
+	letters = AMINO_ACIDS #the amino acids that can be targets, in the order of their bits
+
+	def __init__(self, codon_table):
+		code, AAs, Starts, Base1, Base2, Base3 = codon_table.getTable()
+		self.table = codon_table.code_num
+		self.excluded = tuple(sorted(codon_table.getExcluded()))
+		self.key = (self.table, AAs, self.excluded)
+		self.alphabet = codon_table.getAlphabet()
+
+		#amino acid bit of each real codon, with and without the excluded codons
+		translated = {}
+		for aa, b1, b2, b3 in zip(AAs, Base1, Base2, Base3):
+			translated[b1+b2+b3] = 1 << self.alphabet.index(aa)
+		usable = {}
+		codons = codon_table.getCodons()
+		for aa in self.alphabet:
+			for codon in codons[aa]:
+				usable[codon] = translated[codon]
+
+		#degenerate triplets are unions of the triplets with one nucleotide less, which have lower indices
+		self.encoded = [0] * NUM_TRIPLETS
+		self.reach = [0] * NUM_TRIPLETS
+		self.codon_count = [0] * NUM_TRIPLETS
+		self.stop_count = [0] * NUM_TRIPLETS
+		self.aa_codons = [0] * NUM_TRIPLETS
+		for i in range(NUM_TRIPLETS):
+			masks = [i//w % 15 + 1 for w in WEIGHTS]
+			for m, w in zip(masks, WEIGHTS):
+				if m & (m-1):
+					low = m & -m
+					self.encoded[i] = self.encoded[i-low*w] | self.encoded[i-(m-low)*w]
+					self.reach[i] = self.reach[i-low*w] | self.reach[i-(m-low)*w]
+					self.codon_count[i] = self.codon_count[i-low*w] + self.codon_count[i-(m-low)*w]
+					self.stop_count[i] = self.stop_count[i-low*w] + self.stop_count[i-(m-low)*w]
+					self.aa_codons[i] = self.aa_codons[i-low*w] + self.aa_codons[i-(m-low)*w]
+					break
+			else:
+				codon = ''.join([dna.MaskToAmb(m) for m in masks])
+				self.encoded[i] = translated[codon]
+				self.reach[i] = usable.get(codon, 0)
+				self.codon_count[i] = 1
+				self.stop_count[i] = int(translated[codon] == STOP_BIT)
+				self.aa_codons[i] = 1 << COUNT_BITS*(translated[codon].bit_length()-1)
+
+		self.translated = translated
+		self.reachable = self.reach[-1]
+		assert self.encoded[-1] == self.reachable, 'Error, some amino acids are only encoded by excluded codons. Revise the codon "exclusion list" in settings.txt'
+
+		self.rank()
+
+
+	def rank(self):
+		'''
+		Make the sets of triplets and the rankings used for searching, from what each triplet encodes, its number of codons and its number of stop codons.
+		Amino acids that the genetic code cannot encode get empty sets without looking at the triplets.
+		'''
+		encodable = [self.reachable >> a & 1 == 1 for a in range(len(self.alphabet))]
+
+		#the triplets that can be used for each amino acid, as a set of triplet indices
+		self.cover = [to_bitset([i for i in range(self.size) if self.reach[i] & 1 << a]) if encodable[a] else 0 for a in range(len(self.alphabet))]
+
+		#the triplets that encode each amino acid, including through excluded codons
+		self.encodes = [to_bitset([i for i in range(self.size) if self.encoded[i] & 1 << a]) if encodable[a] else 0 for a in range(len(self.alphabet))]
+
+		#the triplets with each number of codons, fewest codons first
+		levels = {}
+		for i in range(self.size):
+			levels.setdefault(self.codon_count[i], []).append(i)
+		self.codon_levels = [(c, to_bitset(levels[c])) for c in sorted(levels)]
+
+		#the triplets encoding at most k amino acids, for k from 0 to the number of amino acids
+		levels = {}
+		for i in range(self.size):
+			levels.setdefault(popcount(self.encoded[i]), []).append(i)
+		self.max_encoded = []
+		below = 0
+		for k in range(len(self.alphabet)+1):
+			below |= to_bitset(levels.get(k, []))
+			self.max_encoded.append(below)
+
+		#the triplets for each amino acid in ranked order, once for target sets with a stop and once for target sets without
+		self.order = []
+		self.ranked_cover = []
+		self.ranked_containing = {} #filled in by covering_ranked(), by codon and ranking
+		self.mixture_candidates = {} #filled in by mixtures(), with and without penalizing stop codons
+		self.count_levels = {} #filled in by aa_count_levels(), by amino acid
+		for penalize_stop in (False, True):
+			order = sorted(range(self.size), key=lambda i: (popcount(self.encoded[i]), self.codon_count[i], penalize_stop and self.encoded[i] & STOP_BIT != 0, i))
+			self.order.append(order)
+			self.ranked_cover.append([to_bitset([r for r in range(self.size) if self.reach[order[r]] & 1 << a]) if encodable[a] else 0 for a in range(len(self.alphabet))])
+
+		#and once more by the number of stop codons, for pareto(), so that the triplets with the same number of encoded amino acids and codons,
+		#and within those the triplets with the same number of stop codons, have consecutive ranks
+		order = sorted(range(self.size), key=lambda i: (popcount(self.encoded[i]), self.codon_count[i], self.stop_count[i], i))
+		self.order.append(order)
+		self.ranked_cover.append([to_bitset([r for r in range(self.size) if self.reach[order[r]] & 1 << a]) if encodable[a] else 0 for a in range(len(self.alphabet))])
+		self.group_end = [self.size] * self.size #for each rank, the rank after the last one with the same number of encoded amino acids and codons
+		self.run_end = [self.size] * self.size #for each rank, the rank after the last one with the same number of stop codons as well
+		for r in range(self.size-2, -1, -1):
+			i, j = order[r], order[r+1]
+			if (popcount(self.encoded[i]), self.codon_count[i]) != (popcount(self.encoded[j]), self.codon_count[j]):
+				self.group_end[r] = self.run_end[r] = r+1
+			else:
+				self.group_end[r] = self.group_end[r+1]
+				self.run_end[r] = r+1 if self.stop_count[i] != self.stop_count[j] else self.run_end[r+1]
+
+
+	def index_codon(self, index):
+		'''
+		Convert an index in the codon space to the degenerate codon, see index_triplet().
+		'''
+		return index_triplet(index)
+
+
+	def codon_index(self, codon):
+		'''
+		Convert a degenerate codon to its index in the codon space, see triplet_index().
+		'''
+		return triplet_index(codon)
+
+
+	def aa_mask(self, AA_list):
+		'''
+		Convert a list of amino acids in single letter code to an amino acid mask.
+		'''
+		mask = 0
+		for aa in AA_list:
+			mask |= 1 << self.letters.index(aa)
+		return mask
+
+
+	def aa_list(self, mask):
+		'''
+		Convert an amino acid mask to a list of upper case amino acids in single letter code.
+		'''
+		return [self.letters[a] for a in bits(mask)]
+
+
+	def translate(self, codon):
+		'''
+		Translate one "real" codon, regardless of the codon exclusions.
+		Output is an upper case amino acid in single letter code.
+		'''
+		return self.alphabet[self.translated[codon].bit_length()-1]
+
+
+	def covering(self, target, required=()):
+		'''
+		Find all triplets that encode each of the target amino acids that this genetic code can encode.
+		If "real" codons are required, only the triplets that include all of them are kept.
+		The input is an amino acid mask and a tuple of codons, the output is a set of triplet indices.
+		'''
+		output = (1 << self.size) - 1
+		for a in bits(target & self.reachable):
+			output &= self.cover[a]
+		for codon in required:
+			output &= containing(codon)
+		return output
+
+
+	def best(self, target, required=()):
+		'''
+		Find the best triplet for a target set: fewest off-target amino acids, then fewest codons, then no stop codon.
+		The input is an amino acid mask and a tuple of required codons, the output is a triplet index.
+		'''
+		penalize_stop = target & STOP_BIT == 0
+		ranked = self.covering_ranked(target, penalize_stop, required)
+		return self.order[penalize_stop][(ranked & -ranked).bit_length()-1]
+
+
+	def ranked(self, target, required=()):
+		'''
+		Go through the triplets covering a target set best-first, in the order used by best().
+		The triplets are taken from the set one at a time, so the caller can stop early.
+		The input is an amino acid mask and a tuple of required codons, the output is a generator of triplet indices.
+		'''
+		penalize_stop = target & STOP_BIT == 0
+		order = self.order[penalize_stop]
+		remaining = self.covering_ranked(target, penalize_stop, required)
+		while remaining:
+			low = remaining & -remaining
+			yield order[low.bit_length()-1]
+			remaining ^= low
+
+
+	def covering_ranked(self, target, ranking, required=()):
+		'''
+		Find all triplets that encode each of the target amino acids that this genetic code can encode, see covering().
+		The ranking is 0 or 1 for the ranking which does not or does penalize stop codons, or 2 for the ranking by number of stop codons used by pareto().
+		The output is a set of ranks in that ranking, rather than a set of triplet indices.
+		'''
+		output = (1 << self.size) - 1
+		for a in bits(target & self.reachable):
+			output &= self.ranked_cover[ranking][a]
+		for codon in required:
+			if (codon, ranking) not in self.ranked_containing:
+				triplets = containing(codon)
+				self.ranked_containing[codon, ranking] = to_bitset([r for r in range(self.size) if triplets >> self.order[ranking][r] & 1])
+			output &= self.ranked_containing[codon, ranking]
+		return output
+
+
+	def possible(self, target, max_offtarget, required=()):
+		'''
+		Find which amino acids can be added to a target set without the best triplet getting more than max_offtarget off-target amino acids.
+		Adding amino acid a to the targets keeps the covering triplets that encode a and lowers each of their off-target counts by one.
+		So a is possible if a triplet covering the current targets, with at most max_offtarget+1 off-target amino acids, encodes it.
+		All amino acids are checked against that one set of triplets.
+		The input is an amino acid mask, an integer and a tuple of required codons, the output is an amino acid mask.
+		'''
+		#for covering triplets the off-target count is the number of encoded amino acids plus a constant
+		limit = max_offtarget + 1 + popcount(target & self.reachable) - popcount(target & ~self.reachable)
+		if limit < 0:
+			return 0
+		candidates = self.covering(target, required) & self.max_encoded[min(limit, len(self.alphabet))]
+		output = 0
+		for a in bits(self.reachable & ~target):
+			if candidates & self.cover[a]:
+				output |= 1 << a
+		return output
+
+
+	def compatible(self, target, max_offtarget, size=2, required=()):
+		'''
+		Find which sets of amino acids can be added to a target set together without the best triplet getting more than max_offtarget off-target amino acids,
+		which looks further ahead than possible() (the same for sets of one amino acid).
+		Adding a set keeps the covering triplets that can be used for all of it and lowers each of their off-target counts by the size of the set.
+		So a set can be added if a triplet covering the current targets, with at most max_offtarget+size off-target amino acids, can be used for all of it.
+		Those triplets are found with one set intersection and only their distinct sets of usable non-target amino acids are looked at.
+		The input is an amino acid mask, an integer, the number of amino acids in each set and a tuple of required codons, the output is a set of amino acid masks.
+		'''
+		assert size >= 1, 'Error, at least one amino acid must be added.'
+		limit = max_offtarget + size + popcount(target & self.reachable) - popcount(target & ~self.reachable)
+		if limit < 0:
+			return set()
+		candidates = self.covering(target, required) & self.max_encoded[min(limit, len(self.alphabet))]
+		output = set()
+		for usable in set([self.reach[i] & ~target for i in bits(candidates)]):
+			for added in itertools.combinations(bits(usable), size):
+				output.add(sum([1 << a for a in added]))
+		return output
+
+
+	def constrained(self, must, may=0, exclude=0, required=()):
+		'''
+		Find the triplet with the fewest codons that encodes every amino acid in must (that the genetic code can encode) and none in exclude,
+		and that includes the required "real" codons.
+		Amino acids in may are allowed, all others are allowed but counted as off-targets.
+		Ties are broken by fewest off-target amino acids, then no stop codon (unless the stop is in must or may), then triplet index.
+		The feasible triplets are found with set intersections and only those with the fewest codons are looked at.
+		The input is three amino acid masks and a tuple of codons, the output is a triplet index or None if no triplet meets the constraints.
+		'''
+		feasible = self.covering(must, required)
+		for a in bits(exclude & self.reachable):
+			feasible &= ~self.encodes[a]
+		if feasible == 0:
+			return None
+		penalize_stop = (must | may) & STOP_BIT == 0
+		for count, level in self.codon_levels:
+			candidates = feasible & level
+			if candidates:
+				return min(bits(candidates), key=lambda i: (popcount(self.offtarget(i, must) & ~may), penalize_stop and self.encoded[i] & STOP_BIT != 0, i))
+
+
+	def offtarget(self, index, target):
+		'''
+		Compute the off-target amino acids of a triplet, i.e. the encoded amino acids which were not targets
+		and the targets which are not encoded.
+		The input is a triplet index and an amino acid mask, the output is an amino acid mask.
+		'''
+		return self.encoded[index] ^ target
+
+
+	def score(self, index, target):
+		'''
+		Compute the number of off-target amino acids of a triplet, which the best triplet minimizes.
+		The input is a triplet index and an amino acid mask, the output is an integer.
+		'''
+		return popcount(self.offtarget(index, target))
+
+
+	def pareto(self, target, required=()):
+		'''
+		Find the triplets covering a target set that are Pareto-optimal for the score (see score()), the number of codons and the fraction of stop codons,
+		i.e. no other covering triplet is at least as good for all three and better for one of them.
+		The covering triplets are grouped by score and number of codons, of which there are few combinations, keeping the lowest stop fraction of each.
+		For covering triplets the score is the number of encoded amino acids plus a constant, so in the ranking by number of stop codons
+		each group, and within it the triplets with the fewest stop codons, are consecutive ranks, and the groups come in order.
+		So each group takes a few operations on the set of ranks, however many triplets it holds, and is checked against the groups before it straight away.
+		Stop codons only count against a triplet when the stop is not a target, as for best().
+		The input is an amino acid mask and a tuple of required codons, the output is a list of triplet indices, ordered by score, number of codons and stop fraction.
+		'''
+		order = self.order[2]
+		remaining = self.covering_ranked(target, 2, required)
+		offset = 0 #the rank of the lowest bit of remaining, which is shifted down past each group
+		front = [] #the number of codons and stop fraction of the groups kept so far
+		output = []
+		while remaining:
+			r = offset + (remaining & -remaining).bit_length()-1
+			i = order[r]
+			if target & STOP_BIT:
+				fraction = 0.0
+				end = self.group_end[r]
+			else:
+				fraction = float(self.stop_count[i]) / self.codon_count[i]
+				end = self.run_end[r]
+
+			#a group is dominated by an earlier one with as many codons or fewer and as low a stop fraction or lower,
+			#and a group dominated by a dropped group is also dominated by the group that dropped it
+			if all([c > self.codon_count[i] or f > fraction for c, f in front]):
+				front.append((self.codon_count[i], fraction))
+				run = remaining & (1 << end - offset) - 1
+				output.extend(sorted([order[offset + x] for x in bits(run)]))
+			remaining >>= self.group_end[r] - offset
+			offset = self.group_end[r]
+		return output
+
+
+	def codons_per_aa(self, index):
+		'''
+		Count the "real" codons of a triplet that translate to each amino acid, regardless of the codon exclusions.
+		The input is a triplet index, the output is a list with one count per amino acid, in the order of self.alphabet.
+		'''
+		packed = self.aa_codons[index]
+		return [int(packed >> COUNT_BITS*a & (1 << COUNT_BITS) - 1) for a in range(len(self.alphabet))]
+
+
+	def aa_count_levels(self, a):
+		'''
+		Find the triplets with each number of "real" codons for one amino acid, regardless of the codon exclusions.
+		The input is the bit of the amino acid, the output is a list with a set of triplet indices for each number of codons from 0 to 64.
+		'''
+		if a not in self.count_levels:
+			counts = [packed >> COUNT_BITS*a & (1 << COUNT_BITS) - 1 for packed in self.aa_codons]
+			self.count_levels[a] = [to_bitset([i for i in range(NUM_TRIPLETS) if counts[i] == n]) for n in range(65)]
+		return self.count_levels[a]
+
+
+	def query(self, encodes=0, excludes=0, within=None, min_codons=1, max_codons=64, aa_codons=None, required=(), order=('codons',)):
+		'''
+		Find all triplets that meet a set of conditions, looking at what all their "real" codons translate to, and sort them.
+		A triplet is kept if it encodes every amino acid in encodes, none in excludes and, unless within is None, only amino acids in within;
+		if it has from min_codons to max_codons codons; if for each amino acid bit in the aa_codons dictionary
+		its number of codons for that amino acid is within the (lowest, highest) tuple; and if it includes the required "real" codons.
+		Each condition is a set intersection with sets of triplets that are kept for this genetic code, so only the kept triplets are looked at one by one.
+		They are sorted by the keys in order, of which there are 'codons', 'encoded' (the number of encoded amino acids), 'stops' (the number of stop codons)
+		and 'index', each in descending order when prefixed with a '-'. Ties are broken by triplet index.
+		The input is three amino acid masks (within may be None), two integers, a dictionary, a tuple of codons and a tuple of keys,
+		the output is a list of triplet indices.
+		'''
+		if encodes & ~self.reachable:
+			return []
+		output = (1 << NUM_TRIPLETS) - 1
+		for a in bits(encodes):
+			output &= self.encodes[a]
+		for a in bits(excludes & self.reachable):
+			output &= ~self.encodes[a]
+		if within is not None:
+			for a in bits(self.reachable & ~within):
+				output &= ~self.encodes[a]
+		levels = 0
+		for count, level in self.codon_levels:
+			if min_codons <= count <= max_codons:
+				levels |= level
+		output &= levels
+		for a, (lowest, highest) in sorted((aa_codons or {}).items()):
+			levels = 0
+			for level in self.aa_count_levels(a)[max(lowest, 0):highest+1]:
+				levels |= level
+			output &= levels
+		for codon in required:
+			output &= containing(codon)
+
+		values = {'codons':lambda i: self.codon_count[i], 'encoded':lambda i: popcount(self.encoded[i]), 'stops':lambda i: self.stop_count[i], 'index':lambda i: i}
+		for k in order:
+			assert k.lstrip('-') in values, 'Error, %s is not a valid sort key. Use codons, encoded, stops or index, optionally prefixed with a -.' % k
+		return sorted(bits(output), key=lambda i: [-values[k[1:]](i) if k.startswith('-') else values[k](i) for k in order] + [i])
+
+
+	def elements(self, index, target, required=()):
+		'''
+		Find what a triplet contributes to a mixture of triplets (see mixtures()): the target amino acids it can be used for,
+		and above those one bit for each of the required codons that it includes.
+		The input is a triplet index, an amino acid mask and a tuple of codons, the output is an integer.
+		'''
+		output = self.reach[index] & target
+		for n, codon in enumerate(required):
+			if containing(codon) >> index & 1:
+				output |= 1 << len(self.alphabet) + n
+		return output
+
+
+	def group_triplets(self, candidates, grouping, penalize_stop):
+		'''
+		Group triplets, keeping those with the fewest codons and then the fewest stop codons in each group.
+		The input is a list of (triplet index, triplets) pairs, where the triplets are alike for the grouping and have as many codons and stop codons as the index,
+		a function giving the group of a triplet index and whether stop codons count.
+		Output is a dictionary of groups with [(codons, stop codons), triplets] values.
+		'''
+		groups = {}
+		for i, triplets in candidates:
+			key = grouping(i)
+			cost = (self.codon_count[i], self.stop_count[i] if penalize_stop else 0)
+			if key not in groups or cost < groups[key][0]:
+				groups[key] = [cost, list(triplets)]
+			elif cost == groups[key][0]:
+				groups[key][1].extend(triplets)
+		return groups
+
+
+	def mixtures(self, target, max_triplets=3, required=()):
+		'''
+		Find the mixtures of at most max_triplets triplets that together cover a target set, for when one triplet cannot do it without off-targets.
+		Each target amino acid that the genetic code can encode must be covered by one of the triplets and each required codon included in one of them.
+		The off-target amino acids of a mixture are those that any of its triplets encode, and the targets which are not encoded.
+		The best mixtures have the fewest off-target amino acids, then the fewest triplets, then the fewest codons in total, 
+		then the fewest stop codons (unless the stop is a target).
+
+		The triplets are grouped by what they cover and by their off-targets, keeping those with the fewest codons and stop codons in each group.
+		Without required codons this starts from a grouping by what the triplets can cover and encode, which is made once per codon space.
+		A group is dropped when another covers as much with the same off-targets or a subset of them and fewer codons (or as many and fewer stop codons),
+		since swapping it for the other always gives a better mixture.
+		The mixtures are then built by branch and bound, with the limit on the number of triplets raised one at a time.
+		Each step adds a group that covers the target with the fewest groups left to cover it, and the last step only those that cover everything left, 
+		which are found with one set intersection per uncovered target. Partial mixtures that can no longer match the best one are dropped.
+
+		The input is an amino acid mask, an integer and a tuple of required codons.
+		Output is a list of all the best mixtures, each a tuple of triplet indices with the one with most codons first.
+		'''
+		assert max_triplets >= 1, 'Error, a mixture needs at least one triplet.'
+		penalize_stop = target & STOP_BIT == 0
+		goal = self.elements(NUM_TRIPLETS-1, target, required)
+		if goal == 0:
+			return []
+
+		#the triplets with the fewest codons, then stop codons, for each combination of what they cover and their off-targets
+		if len(required) != 0:
+			candidates = [(i, [i]) for i in range(NUM_TRIPLETS)]
+		else:
+			if penalize_stop not in self.mixture_candidates:
+				everything = (1 << len(self.alphabet)) - 1
+				groups = self.group_triplets([(i, [i]) for i in range(NUM_TRIPLETS)], lambda i: (self.elements(i, everything), self.encoded[i]), penalize_stop)
+				self.mixture_candidates[penalize_stop] = [(triplets[0], triplets) for cost, triplets in groups.values()]
+			candidates = self.mixture_candidates[penalize_stop]
+		groups = self.group_triplets(candidates, lambda i: (self.elements(i, target, required), self.encoded[i] & ~target), penalize_stop)
+		for key in [key for key in groups if key[0] == 0]:
+			del groups[key]
+
+		#drop the groups which can always be swapped for a better one, checking the groups with the lowest costs first,
+		#with sets of positions in the kept list for the groups covering each element and those with each off-target amino acid
+		kept = []
+		covering = {}
+		adding = [0] * len(self.alphabet)
+		last = None
+		for (covers, extra), (cost, triplets) in sorted(groups.items(), key=lambda item: item[1][0]):
+			if cost != last:
+				cheaper = (1 << len(kept)) - 1
+				last = cost
+			better = cheaper
+			for e in bits(covers):
+				better &= covering.get(e, 0)
+			for a in bits(extra ^ (1 << len(self.alphabet)) - 1):
+				better &= ~adding[a]
+			if better == 0:
+				for e in bits(covers):
+					covering[e] = covering.get(e, 0) | 1 << len(kept)
+				for a in bits(extra):
+					adding[a] |= 1 << len(kept)
+				kept.append((covers, extra, cost, triplets))
+
+		#renumber the kept groups by number of off-targets, then cost, so that each step can stop at the first group with too many off-targets
+		kept.sort(key=lambda group: (popcount(group[1]), group[2]))
+		covering = {}
+		for n, (covers, extra, cost, triplets) in enumerate(kept):
+			for e in bits(covers):
+				covering[e] = covering.get(e, 0) | 1 << n
+
+		best = None
+		found = set()
+		for limit in range(1, max_triplets+1):
+			stack = [(0, 0, 0, 0, ())] #covered elements, off-targets, codons, stop codons and the groups so far
+			while stack:
+				covered, extra, codons, stops, chosen = stack.pop()
+				left = goal & ~covered
+				if len(chosen) + 1 == limit:
+					candidates = -1
+					for e in bits(left):
+						candidates &= covering.get(e, 0)
+				else:
+					candidates = covering.get(min(bits(left), key=lambda e: popcount(covering.get(e, 0))), 0)
+				partial = []
+				for n in bits(candidates):
+					covers, off, cost, triplets = kept[n]
+					if best is not None and popcount(off) > best[0]:
+						break
+					mixture = (covered | covers, extra | off, codons + cost[0], stops + cost[1], chosen + (n,))
+					complete = mixture[0] == goal
+					bound = (popcount(mixture[1]), len(mixture[4]) + (not complete), mixture[2], mixture[3])
+					if best is not None and bound > best:
+						continue
+					if complete:
+						if best is None or bound < best:
+							best = bound
+							found = set()
+						found.add(tuple(sorted(mixture[4])))
+					elif len(mixture[4]) < limit:
+						partial.append(mixture)
+				stack.extend(reversed(partial)) #the groups with fewest off-targets are taken from the stack first
+
+		output = set()
+		for chosen in found:
+			for mixture in itertools.product(*[kept[n][3] for n in chosen]):
+				output.add(tuple(sorted(mixture, key=lambda i: (-self.codon_count[i], i))))
+		return sorted(output)
+
+
+
+class CombinedSpace(CodonSpace):
+	'''
+	Class that combines the codon spaces of several genetic codes, for finding one triplet to use in all of them.
+	Pass a list of CodonSpace instances and the objective when instantiating.
+	It can be used wherever a CodonSpace is used.
+
+	A triplet covers a target set when it covers it in every genetic code, i.e. it can be used for each target in every code that encodes it.
+	The off-target amino acids of a triplet are those that are off-target in any of the genetic codes.
+	With the objective 'union' the best triplet has the fewest of those.
+	With the objective 'worst' the best triplet has the fewest off-target amino acids in the genetic code where it has the most.
+	Ties are broken by number of codons and stop content, as for a single genetic code.
+
+	For a covering triplet the number of off-targets in one genetic code is its number of encoded amino acids plus a constant,
+	so the triplets with at most k off-targets in every code are found with one set intersection per code.
+	Both objectives only look at such a set for the lowest k where it has a solution, instead of scoring every triplet.
+	'''
+	def __init__(self, spaces, objective='union'):
+		assert objective in ('union', 'worst'), 'Error, %s is not a valid objective. Use union or worst.' % objective
+		self.spaces = spaces
+		self.objective = objective
+		self.table = [space.table for space in spaces]
+		self.key = (objective,) + tuple([space.key for space in spaces])
+
+		#the alphabets all start with AA_ORDER and go on with the unnatural amino acids in order, so the longest one has columns for all of them
+		self.alphabet = max([space.alphabet for space in spaces], key=len)
+		self.reachable = 0
+		for space in spaces:
+			self.reachable |= space.reachable
+		self.encoded = [0] * NUM_TRIPLETS
+		for space in spaces:
+			self.encoded = [a | b for a, b in zip(self.encoded, space.encoded)]
+		self.codon_count = spaces[0].codon_count
+		self.codon_levels = spaces[0].codon_levels
+		self.mixture_candidates = {}
+		self.encodes = [0] * len(self.alphabet)
+		for space in spaces:
+			self.encodes = [a | b for a, b in zip(self.encodes, space.encodes + [0] * (len(self.alphabet) - len(space.alphabet)))]
+
+		#a codon counts as a stop codon if it is one in any of the genetic codes
+		self.stop_count = [0] * NUM_TRIPLETS
+		for i in range(NUM_TRIPLETS):
+			self.stop_count[i] = len([s for s in dna.UnAmb(index_triplet(i)) if any([space.translated[s] == STOP_BIT for space in spaces])])
+
+
+	def translate(self, codon):
+		'''
+		Translate one "real" codon in each of the genetic codes, regardless of the codon exclusions.
+		Output is a string of the distinct upper case amino acids in single letter code.
+		'''
+		return ''.join(sorted(set([space.translate(codon) for space in self.spaces])))
+
+
+	def covering(self, target, required=()):
+		'''
+		Find all triplets that cover the target amino acids in every genetic code and include the required "real" codons.
+		The input is an amino acid mask and a tuple of codons, the output is a set of triplet indices.
+		'''
+		output = (1 << NUM_TRIPLETS) - 1
+		for space in self.spaces:
+			output &= space.covering(target)
+		for codon in required:
+			output &= containing(codon)
+		return output
+
+
+	def elements(self, index, target, required=()):
+		'''
+		Find what a triplet contributes to a mixture of triplets: the target amino acids it can be used for in each genetic code, 
+		one group of bits per genetic code, and above those one bit for each of the required codons that it includes.
+		The input is a triplet index, an amino acid mask and a tuple of codons, the output is an integer.
+		'''
+		output = 0
+		for n, space in enumerate(self.spaces):
+			output |= (space.reach[index] & target) << n*len(self.alphabet)
+		for n, codon in enumerate(required):
+			if containing(codon) >> index & 1:
+				output |= 1 << len(self.alphabet)*len(self.spaces) + n
+		return output
+
+
+	def offtarget(self, index, target):
+		'''
+		Compute the amino acids that are off-target for a triplet in any of the genetic codes.
+		The input is a triplet index and an amino acid mask, the output is an amino acid mask.
+		'''
+		output = 0
+		for space in self.spaces:
+			output |= space.encoded[index] ^ target
+		return output
+
+
+	def score(self, index, target):
+		'''
+		Compute the value of the objective for a triplet, which the best triplet minimizes.
+		The input is a triplet index and an amino acid mask, the output is an integer.
+		'''
+		if self.objective == 'union':
+			return popcount(self.offtarget(index, target))
+		return max([popcount(space.encoded[index] ^ target) for space in self.spaces])
+
+
+	def within(self, target, k, required=()):
+		'''
+		Find the triplets that cover a target set with at most k off-target amino acids in each of the genetic codes.
+		The input is an amino acid mask, an integer and a tuple of required codons, the output is a set of triplet indices.
+		'''
+		output = self.covering(target, required)
+		for space in self.spaces:
+			limit = k - popcount(target & ~space.reachable) + popcount(target & space.reachable)
+			if limit < 0:
+				return 0
+			output &= space.max_encoded[min(limit, len(space.alphabet))]
+		return output
+
+
+	def best(self, target, required=()):
+		'''
+		Find the best triplet for a target set: the lowest objective value, then fewest codons, then no stop codon.
+		The input is an amino acid mask and a tuple of required codons, the output is a triplet index.
+		'''
+		return next(self.ranked(target, required))
+
+
+	def ranked(self, target, required=()):
+		'''
+		Go through the triplets covering a target set best-first, in the order used by best().
+		The triplets are found one objective value at a time, so the caller can stop early.
+		The input is an amino acid mask and a tuple of required codons, the output is a generator of triplet indices.
+		'''
+		penalize_stop = target & STOP_BIT == 0
+		for k in range(len(self.letters)+1):
+			level = [i for i in bits(self.within(target, k, required)) if self.score(i, target) == k]
+			for i in sorted(level, key=lambda i: (self.codon_count[i], penalize_stop and self.encoded[i] & STOP_BIT != 0, i)):
+				yield i
+
+
+	def possible(self, target, max_offtarget, required=()):
+		'''
+		Find which amino acids can be added to a target set with a triplet whose objective value (see score()) is at most max_offtarget.
+		The input is an amino acid mask, an integer and a tuple of required codons, the output is an amino acid mask.
+		'''
+		output = 0
+		for a in bits(self.reachable & ~target):
+			extended = target | 1 << a
+			for i in bits(self.within(extended, max_offtarget, required)):
+				if self.score(i, extended) <= max_offtarget:
+					output |= 1 << a
+					break
+		return output
+
+
+	def compatible(self, target, max_offtarget, size=2, required=()):
+		'''
+		Find which sets of amino acids can be added to a target set together with a triplet whose objective value is at most max_offtarget.
+		Adding a set lowers the off-target count of a triplet in each genetic code by at most the size of the set,
+		so only the triplets with at most max_offtarget+size off-targets in each code are looked at, once for each distinct set of amino acids they encode.
+		The input is an amino acid mask, an integer, the number of amino acids in each set and a tuple of required codons, the output is a set of amino acid masks.
+		'''
+		assert size >= 1, 'Error, at least one amino acid must be added.'
+		output = set()
+		checked = set()
+		for i in bits(self.within(target, max_offtarget + size, required)):
+			key = tuple([(space.encoded[i], space.reach[i]) for space in self.spaces])
+			if key in checked:
+				continue
+			checked.add(key)
+			for added in itertools.combinations(bits(self.encoded[i] & ~target), size):
+				extended = target | sum([1 << a for a in added])
+				if all([extended & space.reachable & ~space.reach[i] == 0 for space in self.spaces]) and self.score(i, extended) <= max_offtarget:
+					output.add(extended & ~target)
+		return output
+
+
+	def pareto(self, target, required=()):
+		'''
+		Find the triplets covering a target set that are Pareto-optimal for the objective value (see score()), the number of codons and the fraction of stop codons.
+		The objective value is not the same constant plus the number of encoded amino acids in each genetic code, so the covering triplets are grouped one at a time.
+		The input is an amino acid mask and a tuple of required codons, the output is a list of triplet indices, ordered by objective value, number of codons and stop fraction.
+		'''
+		groups = {}
+		for i in bits(self.covering(target, required)):
+			key = (self.score(i, target), self.codon_count[i])
+			if target & STOP_BIT:
+				fraction = 0.0
+			else:
+				fraction = float(self.stop_count[i]) / self.codon_count[i]
+			if key not in groups or fraction < groups[key][0]:
+				groups[key] = [fraction, [i]]
+			elif fraction == groups[key][0]:
+				groups[key][1].append(i)
+
+		#a group is dominated by an earlier one with as many codons or fewer and as low a stop fraction or lower
+		lowest = {} #the lowest stop fraction of the groups so far, by number of codons
+		output = []
+		for key in sorted(groups.keys()):
+			fraction, triplets = groups[key]
+			if all([lowest[c] > fraction for c in lowest if c <= key[1]]):
+				output.extend(triplets)
+			lowest[key[1]] = min(lowest.get(key[1], fraction), fraction)
+		return output
+
+
+
+class QuadrupletSpace(CodonSpace):
+	'''
+	Class that holds, for one genetic code with quadruplet codons, the amino acids encoded by each of the 15^4 degenerate quadruplets (4-nt codons).
+	Pass a dna.CodonTable instance made with exclude=True when instantiating, the quadruplet codons are those of its settings (see dna.CodonTable.getQuadruplets()).
+	It can be used wherever a CodonSpace is used for finding the best codon, the alternatives and the possible amino acids, 
+	with quadruplet indices (see quadruplet_index()) in place of triplet indices. Required codons, mixtures and queries are not supported.
+
+	A "real" 4-nt codon with a quadruplet tRNA translates to the amino acid assigned to it.
+	Any other 4-nt codon is read as a triplet, which shifts the reading frame by one nucleotide, 
+	so it translates to FRAMESHIFT, or to a stop if the triplet is a stop codon of the genetic code.
+	The alphabet is AMINO_ACIDS followed by FRAMESHIFT, which is only ever an off-target amino acid: it is never a target or a possible amino acid.
+	The codon exclusions are for triplets, so every 4-nt codon is usable.
+
+	The amino acid masks of the quadruplets are built with the same recurrence as those of the triplets and ranked in the same way,
+	so the best quadruplet is found with one set intersection per target amino acid instead of translating the 256 codons of each quadruplet.
+	Only the few amino acids that 4-nt codons translate to get sets of quadruplets.
+	'''
+	size = NUM_QUADRUPLETS
+	letters = AMINO_ACIDS + FRAMESHIFT
+
+	def __init__(self, codon_table):
+		code, AAs, Starts, Base1, Base2, Base3 = codon_table.getTable()
+		quadruplets = codon_table.getQuadruplets()
+		assert len(quadruplets) > 0, 'Error, no quadruplet codons have been specified. Review the settings.txt file.'
+		self.table = codon_table.code_num
+		self.excluded = ()
+		self.key = ('quadruplet', self.table, AAs, tuple(sorted(quadruplets.items())))
+		self.alphabet = self.letters
+
+		#amino acid bit of each real 4-nt codon
+		triplets = dict([(b1+b2+b3, aa) for aa, b1, b2, b3 in zip(AAs, Base1, Base2, Base3)])
+		translated = {}
+		for codon in dna.UnAmb('NNNN'):
+			if codon in quadruplets:
+				translated[codon] = 1 << self.alphabet.index(quadruplets[codon])
+			elif triplets[codon[:3]] == '*':
+				translated[codon] = STOP_BIT
+			else:
+				translated[codon] = 1 << self.alphabet.index(FRAMESHIFT)
+
+		#degenerate quadruplets are unions of the quadruplets with one nucleotide less, which have lower indices
+		self.encoded = [0] * NUM_QUADRUPLETS
+		self.codon_count = [0] * NUM_QUADRUPLETS
+		self.stop_count = [0] * NUM_QUADRUPLETS
+		for i in range(NUM_QUADRUPLETS):
+			masks = [i//w % 15 + 1 for w in QUADRUPLET_WEIGHTS]
+			for m, w in zip(masks, QUADRUPLET_WEIGHTS):
+				if m & (m-1):
+					low = m & -m
+					self.encoded[i] = self.encoded[i-low*w] | self.encoded[i-(m-low)*w]
+					self.codon_count[i] = self.codon_count[i-low*w] + self.codon_count[i-(m-low)*w]
+					self.stop_count[i] = self.stop_count[i-low*w] + self.stop_count[i-(m-low)*w]
+					break
+			else:
+				codon = ''.join([dna.MaskToAmb(m) for m in masks])
+				self.encoded[i] = translated[codon]
+				self.codon_count[i] = 1
+				self.stop_count[i] = int(translated[codon] == STOP_BIT)
+
+		self.reach = self.encoded
+		self.translated = translated
+		self.reachable = self.encoded[-1]
+		self.rank()
+
+
+	def index_codon(self, index):
+		'''
+		Convert an index in the quadruplet space to the degenerate quadruplet, see index_quadruplet().
+		'''
+		return index_quadruplet(index)
+
+
+	def codon_index(self, codon):
+		'''
+		Convert a degenerate quadruplet to its index in the quadruplet space, see quadruplet_index().
+		'''
+		return quadruplet_index(codon)
+
+
+	def covering(self, target, required=()):
+		'''
+		Find all quadruplets that encode each of the target amino acids that this genetic code can encode, see CodonSpace.covering().
+		'''
+		assert len(required) == 0, 'Error, required codons are not supported for degenerate quadruplets.'
+		return CodonSpace.covering(self, target)
+
+
+	def covering_ranked(self, target, ranking, required=()):
+		'''
+		Find all quadruplets that encode each of the target amino acids that this genetic code can encode, as a set of ranks, see CodonSpace.covering_ranked().
+		'''
+		assert len(required) == 0, 'Error, required codons are not supported for degenerate quadruplets.'
+		return CodonSpace.covering_ranked(self, target, ranking)
+
+
+	def possible(self, target, max_offtarget, required=()):
+		'''
+		Find which amino acids can be added to a target set without the best quadruplet getting more than max_offtarget off-target amino acids, 
+		see CodonSpace.possible(). FRAMESHIFT is not one of them.
+		'''
+		return CodonSpace.possible(self, target, max_offtarget, required) & ~self.aa_mask([FRAMESHIFT])
+
+
+	def compatible(self, target, max_offtarget, size=2, required=()):
+		'''
+		Find which sets of amino acids can be added to a target set together, see CodonSpace.compatible(). The sets do not hold FRAMESHIFT.
+		'''
+		frameshift = self.aa_mask([FRAMESHIFT])
+		return set([added for added in CodonSpace.compatible(self, target, max_offtarget, size, required) if added & frameshift == 0])
+
+
+
+_spaces = {} #codon spaces by codon space key
+_settings_spaces = {} #the same codon spaces by genetic code and dna.Settings object
+
+def get_space(table=1, settings=None):
+	'''
+	Get the codon space of a genetic code, with the codon exclusions of a dna.Settings object applied (by default those in the settings file).
+	Codon spaces are computed once per genetic code and settings and then re-used.
+	'''
+	return get_spaces([table], settings)[0]
+
+
+def get_spaces(tables, settings=None):
+	'''
+	Get the codon spaces of several genetic codes, see get_space().
+	Output is a list of codon spaces in the order of the tables.
+	'''
+	if settings is None:
+		settings = dna.read_settings()
+	output = []
+	for table in tables:
+		key = (int(table), settings)
+		if key not in _settings_spaces:
+			_settings_spaces[key] = cached_space(dna.GetCodonTable(table, True, settings))
+		output.append(_settings_spaces[key])
+	return output
+
+
+_combined_spaces = {}
+
+def get_combined_space(tables, objective='union', settings=None):
+	'''
+	Get the combined codon space of several genetic codes, see CombinedSpace and get_space().
+	'''
+	spaces = get_spaces(tables, settings)
+	key = (objective,) + tuple([space.key for space in spaces]) #same as CombinedSpace.key
+	if key not in _combined_spaces:
+		_combined_spaces[key] = CombinedSpace(spaces, objective)
+	return _combined_spaces[key]
+
+
+def cached_space(codon_table):
+	'''
+	Get the codon space of a dna.CodonTable made with exclude=True, computing it only if the same codon table and exclusions have not been seen before,
+	for instance with settings that only differ in the library coverage.
+	'''
+	key = (codon_table.code_num, codon_table.getTable()[1], tuple(sorted(codon_table.getExcluded()))) #same as CodonSpace.key
+	if key not in _spaces:
+		_spaces[key] = CodonSpace(codon_table)
+	return _spaces[key]
+
+
+_quadruplet_spaces = {} #quadruplet spaces by quadruplet space key
+
+def get_quadruplet_space(table=1, settings=None):
+	'''
+	Get the quadruplet space of a genetic code with the quadruplet codons of a dna.Settings object (by default those in the settings file).
+	Quadruplet spaces are computed once per genetic code and quadruplet codons and then re-used.
+	'''
+	if settings is None:
+		settings = dna.read_settings()
+	codon_table = dna.GetCodonTable(table, True, settings)
+	key = ('quadruplet', codon_table.code_num, codon_table.getTable()[1], tuple(sorted(codon_table.getQuadruplets().items()))) #same as QuadrupletSpace.key
+	if key not in _quadruplet_spaces:
+		_quadruplet_spaces[key] = QuadrupletSpace(codon_table)
+	return _quadruplet_spaces[key]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+
+#The ambiguous nucleotide tool (ANT) is a free and open source tool aimed at
+#generating and analysing degenerate codons to support research in protein engineering, directed evolution and synthetic biology.
+
+#Copyright (C) 2015  Martin Engqvist |
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#LICENSE:
+#This file is part of ANT.
+#
+#ANT is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 3 of the License, or
+#(at your option) any later version.
+#
+#ANT is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU Library General Public License for more details.
+#
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+#Get source code at: https://github.com/mengqvist/ANT
+#
+
+
+
+#This file holds codon usage tables, i.e. how often a host organism uses each of the 64 "real" codons.
+#They are used to weight the amino acid distribution of degenerate codons and to penalize rare codons in the design.
+
+import os
+import re
+
+import codon_space
+
+
+
+class CodonUsage:
+	'''
+	Class that holds the codon usage of one organism.
+	Pass a dictionary of codons (GATC or GAUC) and their frequencies, or counts, and optionally the name of the organism when instantiating.
+	To read a codon usage table from a file use read_usage().
+
+	To get the frequencies as fractions that sum to one (as a list in the order of codon_space.CODONS):
+	usage.getFrequencies()
+
+	To get the relative adaptiveness of each codon, its frequency divided by that of the most used synonymous codon in a genetic code 
+	(as a list in the order of codon_space.CODONS):
+	usage.getAdaptiveness(space)
+	'''
+	def __init__(self, frequencies, name=''):
+		frequencies = dict([(s.upper().replace('U', 'T'), float(f)) for s, f in frequencies.items()])
+		missing = [s for s in codon_space.CODONS if s not in frequencies]
+		assert len(missing) == 0, 'Error, the codon usage table lacks the codons %s.' % missing
+		assert all([f >= 0 for f in frequencies.values()]) and sum(frequencies.values()) > 0, 'Error, the codon frequencies must be positive numbers.'
+		total = sum([frequencies[s] for s in codon_space.CODONS])
+		self.name = name
+		self.frequencies = tuple([frequencies[s]/total for s in codon_space.CODONS])
+
+
+	def getFrequencies(self):
+		'''
+		Retrieves the codon frequencies.
+		Output is a list of fractions summing to one, in the order of codon_space.CODONS.
+		'''
+		return list(self.frequencies)
+
+
+	def getFrequency(self, codon):
+		'''
+		Retrieves the frequency of one codon.
+		Output is a fraction.
+		'''
+		return self.frequencies[codon_space.CODONS.index(codon.upper().replace('U', 'T'))]
+
+
+	def getAdaptiveness(self, space):
+		'''
+		Retrieves the relative adaptiveness of each codon: its frequency divided by the highest frequency among the codons
+		that encode the same amino acid in the genetic code of a codon space. Codons of amino acids the organism never uses get 0.
+		Output is a list of fractions in the order of codon_space.CODONS.
+		'''
+		highest = {}
+		for codon, f in zip(codon_space.CODONS, self.frequencies):
+			aa = space.translated[codon]
+			highest[aa] = max(highest.get(aa, 0), f)
+		return [f/highest[space.translated[s]] if highest[space.translated[s]] > 0 else 0.0 for s, f in zip(codon_space.CODONS, self.frequencies)]
+
+
+
+_usage_files = {} #codon usage tables read from files, by path, together with the modification time and size of the file when it was read
+
+def read_usage(path, name=None):
+	'''
+	Read a codon usage table from a file. Every codon (GATC or GAUC) in the file must be followed by its frequency or count,
+	which covers the common formats: the Kazusa codon usage database ("UUU 17.6(714298)"), 
+	the GCG format ("Phe UUU 714298.00 17.60 0.46", where the count is used) and comma or tab separated codon, frequency lines.
+	The name defaults to the file name. The file is only read again when it has been changed.
+	Output is a CodonUsage object.
+	'''
+	path = os.path.abspath(path)
+	if name is None:
+		name = os.path.splitext(os.path.basename(path))[0]
+	stat = os.stat(path)
+	stamp = (stat.st_mtime, stat.st_size, name)
+	if path not in _usage_files or _usage_files[path][0] != stamp:
+		f = open(path, 'r')
+		text = f.read()
+		f.close()
+		frequencies = {}
+		for codon, number in re.findall('(?<![A-Za-z])([GATCUgatcu]{3})(?![A-Za-z])[\s,;:=]+([0-9]*\.?[0-9]+)', text):
+			frequencies[codon.upper().replace('U', 'T')] = number
+		_usage_files[path] = (stamp, CodonUsage(frequencies, name))
+	return _usage_files[path][1]
@@ -29,18 +29,22 @@
 #
 
 
+import os
 import random
 import re
+from collections import namedtuple
+import protein
 
 
-def Translate(DNA, table=1):
+def Translate(DNA, table=1, settings=None):
 	"""
 	Returns protein sequence from DNA string input.
 	The table variable specifies which codon table should be used.
 	table defaults to the standard codon table 1
+	settings is a Settings object, by default the settings file is used.
 	"""
 	assert type(DNA) == str or type(DNA) == unicode, 'Error, input sequence must be a string or unicode'
-	codons = CodonTable(table).getCodons()
+	codons = GetCodonTable(table, settings=settings).getCodons()
 
 	protein = []
 	DNA = DNA.upper()
@@ -93,15 +97,15 @@ def Translate(DNA, table=1):
 				protein.append('Q')
 			elif any(DNA[i:(i+3)] in s for s in codons['G']):
 				protein.append('G')
-			elif any(DNA[i:(i+3)] in s for s in codons['U']): #special case allowing for unnatural AA
-				protein.append('U')
+			elif any(DNA[i:(i+3)] in codons.get(s, []) for s in NONCANONICAL): #special case allowing for unnatural AAs
+				protein.append([s for s in NONCANONICAL if DNA[i:(i+3)] in codons.get(s, [])][0])
 			else:
 				raise ValueError, '"%s" is not a valid codon' % DNA[i:(i+3)]
 	return ''.join(protein)	
 
 
 	
-def GetCodons(AA, table=1, separate=False, exclude=False):
+def GetCodons(AA, table=1, separate=False, exclude=False, settings=None):
 	'''
 	Get the codons for a specified AA. Returns a list of strings.
 	The variable table specifies which codon table should be used.
@@ -110,14 +114,15 @@ def GetCodons(AA, table=1, separate=False, exclude=False):
 	For example if separate=False the codons for L are 	['TTA', 'TTG', 'CTT', 'CTC', 'CTA', 'CTG'].
 	If separate=True they are split up as L = ['TTA', 'TTG'] and L2 = ['CTT', 'CTC', 'CTA', 'CTG'].
 	exclude deterimes whether user-defined codons should be excluded or not. Valid values are True and False.
+	settings is a Settings object, by default the settings file is used.
 	'''
 	AA = AA.upper()
 	assert len(AA) == 1, 'Error, function takes a single amino acid as input'
-	assert AA in 'FLSYCWPHERIMTNKVADQG*U', 'Error, %s is not a valid amino acid' % str(AA)
+	assert AA in CANONICAL + NONCANONICAL, 'Error, %s is not a valid amino acid' % str(AA)
 
-	codons = CodonTable(table, exclude).getCodons(separate)
+	codons = GetCodonTable(table, exclude, settings).getCodons(separate)
 
-	return codons[AA]	
+	return list(codons.get(AA, []))
 	
 
 
@@ -309,10 +314,140 @@ def commonNuc(nuc_list, greedy=False):
 
 	if all(['C' in s or 'T' in s or 'A' in s or 'G' in s for s in nuc_list]):
 		output.append('N')
-		
+
 	return output
 
+
+
+#the IUPAC symbols ordered by their 4-bit nucleotide mask (A=1, C=2, G=4, T=8), the symbol with mask m is at index m-1
+IUPAC_BY_MASK = 'ACMGRSVTWYHKDBN'
+
+
+def AmbToMask(letter):
+	'''
+	Converts a single IUPAC nucleotide symbol to a 4-bit nucleotide mask where A=1, C=2, G=4 and T=8.
+	For example 'R' (A or G) gives 5 and 'N' gives 15.
+	The output is an integer.
+	'''
+	letter = letter.upper()
+	assert len(letter) == 1 and letter in IUPAC_BY_MASK, 'Error, "%s" is not a valid ambigous nucleotide.' % letter
+	return IUPAC_BY_MASK.index(letter) + 1
+
+
+def MaskToAmb(mask):
+	'''
+	Converts a 4-bit nucleotide mask (A=1, C=2, G=4, T=8) to the IUPAC nucleotide symbol representing it.
+	The output is a one-letter string.
+	'''
+	assert type(mask) is int and 1 <= mask <= 15, 'Error, %s is not a valid nucleotide mask.' % mask
+	return IUPAC_BY_MASK[mask-1]
+
 		
+
+#the canonical amino acids and the stop, and the non-canonical amino acids: U, and U1 to U9 written as the digits 1 to 9, only user-defined genetic codes use them
+CANONICAL = protein.CANONICAL
+NONCANONICAL = protein.NONCANONICAL
+
+#the numbers of all genetic codes that CodonTable knows about, 1001 is the user-defined one from the settings file
+GENETIC_CODES = [1, 2, 3, 4, 5, 6, 9, 10, 11, 12, 13, 14, 15, 16, 21, 22, 23, 24, 25, 1001]
+
+#the settings file that is used when no settings are given, next to this file so it does not depend on the working directory
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.txt')
+
+
+class Settings(namedtuple('Settings', ['code', 'AAs', 'Starts', 'Base1', 'Base2', 'Base3', 'codons_to_exclude', 'library_coverage', 'quadruplet_codons'])):
+	'''
+	The user-defined settings: the name and contents of codon table 1001 (code, AAs, Starts, Base1, Base2, Base3), 
+	the codons to exclude from degenerate codon computations, the library coverage (in %) used for the screening burden
+	and the quadruplet codons, 4-nt codons read by quadruplet tRNAs, with the amino acids they are assigned to.
+	The quadruplet codons are given as a dictionary and kept as a sorted tuple of (codon, amino acid) pairs.
+	See settings.txt for what each of them means, values that are not given are those in the settings file shipped with ANT.
+	
+	Settings objects are immutable and hashable, so objects computed from them can be cached per configuration.
+	To get the settings from a file, use read_settings(). To get a copy with some values changed:
+	settings.change(codons_to_exclude=['CTG', 'TAA'])
+	'''
+	__slots__ = ()
+	
+	def __new__(cls, code='Standard Code With UAG Codon Reassignment (transl_table=1001)', 
+				AAs='FFLLSSSSYY*UCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+				Starts='---M---------------M---------------M----------------------------',
+				Base1='TTTTTTTTTTTTTTTTCCCCCCCCCCCCCCCCAAAAAAAAAAAAAAAAGGGGGGGGGGGGGGGG',
+				Base2='TTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGG',
+				Base3='TCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAG',
+				codons_to_exclude=(), library_coverage=95, quadruplet_codons=()):
+		#make sure the settings are ok
+		assert type(code) is str, 'Error, the Review the settings.txt file.'
+
+		assert type(codons_to_exclude) in (list, tuple), 'Error, the codons for exclusion must be in a list. Review the settings.txt file.' #make sure it is a list
+		codons_to_exclude = tuple([s.upper() for s in codons_to_exclude]) #make uppercase
+		for item in codons_to_exclude:
+			assert re.match('^[ATCG]{3}$', item) != None, 'Error, %s is not a valid DNA codon to exclude. Please review the settings.txt file.' % item
+
+		for aa in CANONICAL:
+			assert aa in AAs, 'Error, the amino acid %s has not been specified. Review the settings.txt file.' % aa
+		for aa in AAs:
+			assert aa in CANONICAL + NONCANONICAL, 'Error, "%s" is not a valid amino acid, use U or the digits 1 to 9 for unnatural amino acids. Review the settings.txt file.' % aa
+ 
+		assert Base1 == 'TTTTTTTTTTTTTTTTCCCCCCCCCCCCCCCCAAAAAAAAAAAAAAAAGGGGGGGGGGGGGGGG', 'Error, the Base1 field is not correct. Review the settings.txt file.'
+		assert Base2 == 'TTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGG', 'Error, the Base2 field is not correct. Review the settings.txt file.'
+		assert Base3 == 'TCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAG', 'Error, the Base3 field is not correct. Review the settings.txt file.'
+
+		assert type(library_coverage) is int, 'Error, the library coverage must be an integer between 1 and 99. Please review the settings.txt file.'
+		assert 1 <= library_coverage <= 99, 'Error, the library coverage must be an integer between 1 and 99. Please review the settings.txt file.'
+
+		if type(quadruplet_codons) is dict:
+			quadruplet_codons = quadruplet_codons.items()
+		quadruplet_codons = tuple(sorted([(str(codon).upper(), str(aa).upper()) for codon, aa in quadruplet_codons]))
+		for codon, aa in quadruplet_codons:
+			assert re.match('^[ATCG]{4}$', codon) != None, 'Error, %s is not a valid quadruplet codon. Please review the settings.txt file.' % codon
+			assert len(aa) == 1 and aa in CANONICAL + NONCANONICAL, 'Error, "%s" is not a valid amino acid for the quadruplet codon %s. Review the settings.txt file.' % (aa, codon)
+		assert len(set([codon for codon, aa in quadruplet_codons])) == len(quadruplet_codons), 'Error, a quadruplet codon is assigned to more than one amino acid. Review the settings.txt file.'
+		return super(Settings, cls).__new__(cls, code, AAs, Starts, Base1, Base2, Base3, codons_to_exclude, library_coverage, quadruplet_codons)
+
+	def change(self, **values):
+		'''
+		Make a copy of the settings with some of the values changed, for instance change(codons_to_exclude=['CTG']).
+		'''
+		settings = self._asdict()
+		settings.update(values)
+		return Settings(**settings)
+
+
+_settings_files = {} #settings read from files, by path, together with the modification time and size of the file when it was read
+
+def read_settings(path=SETTINGS_FILE):
+	'''
+	Read a settings file, by default the settings.txt file that comes with ANT.
+	The file is only read again when it has been changed.
+	Output is a Settings object.
+	'''
+	path = os.path.abspath(path)
+	stat = os.stat(path)
+	stamp = (stat.st_mtime, stat.st_size)
+	if path not in _settings_files or _settings_files[path][0] != stamp:
+		values = dict()
+		execfile(path, values)
+		settings = Settings(**dict([(s, values[s]) for s in Settings._fields if s in values]))
+		_settings_files[path] = (stamp, settings)
+	return _settings_files[path][1]
+
+
+_codon_tables = {}
+
+def GetCodonTable(number, exclude=False, settings=None):
+	'''
+	Get a CodonTable, which is made once for each genetic code, exclude value and Settings object and then re-used.
+	settings is a Settings object, by default the settings file is used.
+	The returned object is shared, so it should not be modified.
+	'''
+	if settings is None:
+		settings = read_settings()
+	key = (int(number), exclude, settings)
+	if key not in _codon_tables:
+		_codon_tables[key] = CodonTable(number, exclude, settings)
+	return _codon_tables[key]
+
 				
 class CodonTable:
 	'''
@@ -320,17 +455,19 @@ class CodonTable:
 	Used to retrieve codon tables and codons for specified codon tables.	
 	Pass a valid integer value when instantiating to choose which codon table to use.
 	If exclude=True then certain codons will be excluded from the lists.
+	The user-defined codon table and the codons to exclude come from a Settings object, by default the one in the settings file (see read_settings()).
 	'''
-	def __init__(self, number, exclude=False):
+	def __init__(self, number, exclude=False, settings=None):
 		self.code = False
 		self.code_num = False
 		self.table = False
 		self.codons = False
 
 		#variable to hold user-defined data (from settings file)
-		self.settings = dict()
+		self.settings = settings
 
-		self.readSettings() #read settings file to get user-defined codon table and list of codons to exclude
+		if settings is None:
+			self.readSettings() #read settings file to get user-defined codon table and list of codons to exclude
 		self.setTable(number) #get the specified codon table (returned as list of strings)
 		self.setCodons(exclude) #convert the codon table information to codons
 		
@@ -340,26 +477,7 @@ class CodonTable:
 		Method which reads the settings file to get the user-defined codon table and which (if any) codons should get excluded.
 		These are stored and used when computing degenerate codons (self.remove) or if codon table 1001 is chosen (the other variables). 
 		'''
-
-		#get the settings
-		execfile('./settings.txt', self.settings)
-
-		#make sure the settings are ok
-		assert type(self.settings['code']) is str, 'Error, the Review the settings.txt file.'
-
-		assert type(self.settings['codons_to_exclude']) is list, 'Error, the codons for exclusion must be in a list. Review the settings.txt file.' #make sure it is a list
-
-		if len(self.settings['codons_to_exclude']) != 0: #if there are items in it
-			self.settings['codons_to_exclude'] = [s.upper() for s in self.settings['codons_to_exclude']] #make uppercase
-			for item in self.settings['codons_to_exclude']:
-				assert re.match('^[ATCG]{3}$', item) != None, 'Error, %s is not a valid DNA codon to exclude. Please review the settings.txt file.' % item
-
-		for aa in 'FLSYCWPHERIMTNKVADQG*U':
-			assert aa in self.settings['AAs'], 'Error, the amino acid %s has not been specified. Review the settings.txt file.'
- 
-		assert self.settings['Base1'] == 'TTTTTTTTTTTTTTTTCCCCCCCCCCCCCCCCAAAAAAAAAAAAAAAAGGGGGGGGGGGGGGGG', 'Error, the Base1 field is not correct. Review the settings.txt file.'
-		assert self.settings['Base2'] == 'TTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGGTTTTCCCCAAAAGGGG', 'Error, the Base2 field is not correct. Review the settings.txt file.'
-		assert self.settings['Base3'] == 'TCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAGTCAG', 'Error, the Base3 field is not correct. Review the settings.txt file.'
+		self.settings = read_settings()
 
 
 	def setTable(self, number):
@@ -542,12 +660,12 @@ class CodonTable:
 			
 		elif number == 1001:
 			#User-Defined Genetic Code [1001] is loaded from settings file.
-			code = self.settings['code']
-			AAs  =   self.settings['AAs']
-			Starts = self.settings['Starts']
-			Base1  = self.settings['Base1']
-			Base2  = self.settings['Base2']
-			Base3  = self.settings['Base3']
+			code = self.settings.code
+			AAs  =   self.settings.AAs
+			Starts = self.settings.Starts
+			Base1  = self.settings.Base1
+			Base2  = self.settings.Base2
+			Base3  = self.settings.Base3
 		
 		else:
 			raise ValueError, '%s is not a valid genetic code number' % number
@@ -566,19 +684,21 @@ class CodonTable:
 
 		#check whether certain codons should be excluded
 		if exclude is True:
-			remove = self.settings['codons_to_exclude']
+			remove = self.settings.codons_to_exclude
 		else:
 			remove = []
 
 		#now get the amino acids
 		code, AAs, Starts, Base1, Base2, Base3 = self.getTable()
 		codons = {'start':[], 'F':[], 'L':[], 'S':[], 'Y':[], 'C':[], 'W':[], 'P':[], 'H':[], 'E':[], 'R':[], 'I':[], 'M':[], 'T':[], 'N':[], 'K':[], 'V':[], 'A':[], 'D':[], 'Q':[], 'G':[], '*':[], 'U':[]}
+		for aa in self.getAlphabet():
+			codons.setdefault(aa, [])
 		for aa, s, b1, b2, b3 in zip(AAs, Starts, Base1, Base2, Base3):
 			codon = b1+b2+b3
 
 			if codon in remove:
 				continue
-			elif aa in 'FLSYCWPHERIMTNKVADQG*U':
+			elif aa in codons:
 				codons[aa].append(codon)
 			else:
 				raise ValueError, '"%s" is not a valid amino acid' % aa
@@ -586,10 +706,9 @@ class CodonTable:
 			if s != '-': #if the codon is start
 				codons['start'].append(codon)
 			
+		#every amino acid in the codon table must keep a codon, U and the unnatural amino acids below the highest one are in the dictionary without being in every codon table
 		for key in codons.keys():
-			if key != 'U':
-				assert codons[key] != [], 'Error, there is no codon assigned to amino acid %s. Revise the user-edited codon table and the codon "exclusion list" in settings.txt' % key
-			elif key == 'U' and self.code_num == 1001:
+			if key not in NONCANONICAL or key in AAs:
 				assert codons[key] != [], 'Error, there is no codon assigned to amino acid %s. Revise the user-edited codon table and the codon "exclusion list" in settings.txt' % key
 
 
@@ -600,7 +719,25 @@ class CodonTable:
 		'''
 		Return which codons were excluded from the computation.
 		'''
-		return self.settings['codons_to_exclude']
+		return list(self.settings.codons_to_exclude)
+
+	def getQuadruplets(self):
+		'''
+		Return the quadruplet codons and the amino acids they are assigned to, which are the same for every genetic code.
+		The output is a dictionary with four-letter codon keys and upper case amino acids in single letter code as values.
+		'''
+		return dict(self.settings.quadruplet_codons)
+
+	def getAlphabet(self):
+		'''
+		Return the amino acids of the genetic code in the order used for amino acid masks:
+		FLSYCWPHERIMTNKVADQG*U, followed by the unnatural amino acids U1 to U9 (the digits 1 to 9) up to the highest one in the codon table.
+		Each amino acid then has the same position in every genetic code, those without codons are kept like U is.
+		The output is a string.
+		'''
+		AAs = self.getTable()[1]
+		last = max([0] + [n for n, s in enumerate(NONCANONICAL) if n > 0 and s in AAs])
+		return CANONICAL + NONCANONICAL[:last+1]
 
 	def getCode(self):
 		'''
@@ -631,7 +768,7 @@ class CodonTable:
 			return self.codons 
 		elif separate is True:
 			newdict = {}
-			for aa in 'FLSYCWPHERIMTNKVADQG*U':
+			for aa in self.getAlphabet():
 				f = lambda x: [codon[0:2] for codon in x] #function to get all first two nucleotides for an aa
 				firsttwolist = list(set(f(self.codons[aa]))) #list of all unique first two nucleotides for an aa. For example ['TT', 'CT'] for leucine
 #				print('aa', aa)
@@ -665,7 +802,7 @@ class CodonTable:
 		codons = self.getCodons()
 		print('start = %s' %codons['start'])
 		print('stop  = %s' %codons['stop'])
-		for aa in 'FLSYCWPHERIMTNKVADQG*U':
+		for aa in self.getAlphabet():
 			print('%s     = %s' % (aa, codons[aa]))
 		
 		
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+
+
+#The ambiguous nucleotide tool (ANT) is a free and open source tool aimed at
+#generating and analysing degenerate codons to support research in protein engineering, directed evolution and synthetic biology.
+
+#Copyright (C) 2015  Martin Engqvist |
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#LICENSE:
+#This file is part of ANT.
+#
+#ANT is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 3 of the License, or
+#(at your option) any later version.
+#
+#ANT is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU Library General Public License for more details.
+#
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+#Get source code at: https://github.com/mengqvist/ANT
+#
+
+
+
+#This file computes the best degenerate codon for every subset of the amino acids of a genetic code
+#and stores the answers in a binary file, so that later queries only need to look up the answer.
+#
+#The file starts with the 8-byte magic string, a 4-byte little-endian header length and a JSON header
+#holding the genetic code, its codon table, the excluded codons and the range of amino acid masks in the file.
+#After the header there is one 7-byte record per amino acid mask, in mask order, packed as '<HIB':
+#the best triplet index (65535 if the mask holds no amino acid encoded by the genetic code),
+#the off-target amino acid mask and the number of codons of the triplet.
+#
+#For building the answers of many genetic codes the masks can be split up in shards.
+#A plan file lists the shards as lines of plain text: the genetic code, the first and last+1 mask and the shard file name.
+#The shards are computed by a pool of processes, or by hand on other machines, and each shard file only appears when it is complete.
+#A build that is stopped therefore resumes with the shards that have no file yet.
+#When all shards are done they are merged into one answer file per genetic code, which is checked against the codon space.
+
+import codon_space
+import dna
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+
+
+MAGIC = 'ANTPRE\x00\x01'
+RECORD = struct.Struct('<HIB')
+NO_TRIPLET = 0xFFFF
+NUM_MASKS = 1 << len(codon_space.AA_ORDER)
+
+
+
+def make_header(space, start=0, stop=NUM_MASKS):
+	'''
+	Make the header of an answer file, or of a shard file holding the masks from start up to stop, for a codon space.
+	Output is a string.
+	'''
+	table, AAs, excluded = space.key
+	text = json.dumps({'table':table, 'AAs':AAs, 'excluded':list(excluded), 'record':RECORD.format, 'masks':NUM_MASKS, 'start':start, 'stop':stop})
+	return MAGIC + struct.pack('<I', len(text)) + text
+
+
+def read_header(data, path):
+	'''
+	Read the header at the start of an answer file or shard file and check that the file is complete.
+	Output is a tuple of the header as a dictionary, the codon space key it was made for and the offset of the first record.
+	'''
+	assert data[:len(MAGIC)] == MAGIC, 'Error, %s is not an ANT answer file.' % path
+	length = struct.unpack('<I', data[len(MAGIC):len(MAGIC)+4])[0]
+	header = json.loads(data[len(MAGIC)+4:len(MAGIC)+4+length])
+	offset = len(MAGIC) + 4 + length
+	assert header['record'] == RECORD.format and header['masks'] == NUM_MASKS, 'Error, %s was made for another amino acid alphabet or record format.' % path
+	assert len(data) == offset + (header['stop']-header['start']) * RECORD.size, 'Error, the answer file %s is incomplete.' % path
+	key = (header['table'], str(header['AAs']), tuple([str(s) for s in header['excluded']]))
+	return header, key, offset
+
+
+def compute_range(space, start, stop):
+	'''
+	Compute the answers for the amino acid masks from start up to (not including) stop.
+	The range must be a power of two long and start at a multiple of its length,
+	i.e. all masks in it share their high bits and differ in the low bits.
+	Output is a string of packed records, one per mask.
+	'''
+	size = stop - start
+	assert size > 0 and size & (size-1) == 0 and start % size == 0, 'Error, %s to %s is not an aligned range of amino acid masks.' % (start, stop)
+	assert len(space.alphabet) == len(codon_space.AA_ORDER), 'Error, answer files can not be made for genetic codes with the unnatural amino acids U1 to U9.'
+	free = [b for b in range(len(codon_space.AA_ORDER)) if 1 << b < size]
+	output = bytearray(size * RECORD.size)
+
+	def fill(mask, ranked, penalize_stop, remaining):
+		#store the answer for this mask, then go on with every mask that adds amino acids from the remaining ones
+		if mask & space.reachable:
+			index = space.order[penalize_stop][(ranked & -ranked).bit_length()-1]
+			RECORD.pack_into(output, (mask-start)*RECORD.size, index, space.offtarget(index, mask), space.codon_count[index])
+		else:
+			RECORD.pack_into(output, (mask-start)*RECORD.size, NO_TRIPLET, mask, 0)
+		for j in range(len(remaining)):
+			b = remaining[j]
+			if space.reachable & 1 << b:
+				fill(mask | 1 << b, ranked & space.ranked_cover[penalize_stop][b], penalize_stop, remaining[j+1:])
+			else:
+				fill(mask | 1 << b, ranked, penalize_stop, remaining[j+1:])
+
+	#whether stop codons are penalized depends on the stop being a target, so that choice is made first
+	stop_bit = codon_space.AA_ORDER.index('*')
+	if stop_bit in free:
+		starts = [start, start | codon_space.STOP_BIT]
+	else:
+		starts = [start]
+	for mask in starts:
+		penalize_stop = mask & codon_space.STOP_BIT == 0
+		fill(mask, space.covering_ranked(mask, penalize_stop), penalize_stop, [b for b in free if b != stop_bit])
+	return str(output)
+
+
+def build(table, path):
+	'''
+	Compute the answers for every amino acid mask of a genetic code and write them to an answer file.
+	The codon exclusions from the settings file are applied.
+	'''
+	space = codon_space.get_space(table)
+	f = open(path, 'wb')
+	f.write(make_header(space))
+	f.write(compute_range(space, 0, NUM_MASKS))
+	f.close()
+
+
+
+class AnswerFile:
+	'''
+	Class for looking up answers in a file made by precompute.py.
+	Pass the path of the file when instantiating. The file is memory mapped, not read.
+
+	To check that the file was made with the same codon table and codon exclusions as a codon space:
+	answer_file.matches(space)
+
+	To get the best triplet index, the off-target amino acid mask and the number of codons for an amino acid mask:
+	answer_file.lookup(mask)
+	'''
+	def __init__(self, path):
+		f = open(path, 'rb')
+		self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		f.close()
+		self.header, self.key, self.offset = read_header(self.map, path)
+		assert self.header['start'] == 0 and self.header['stop'] == NUM_MASKS, 'Error, %s is a shard file, merge the shards first.' % path
+
+	def matches(self, space):
+		'''
+		Check whether the file was made for the genetic code, codon table and codon exclusions of a codon space.
+		'''
+		return self.key == space.key
+
+	def lookup(self, mask):
+		'''
+		Look up the answer for an amino acid mask.
+		Output is a tuple of the best triplet index (65535 if there is none), the off-target amino acid mask and the number of codons.
+		'''
+		return RECORD.unpack_from(self.map, self.offset + mask * RECORD.size)
+
+
+
+def write_plan(directory, tables, shards=64):
+	'''
+	Split the amino acid masks of each genetic code into a number of shards (a power of two)
+	and write the plan file (plan.txt) to the build directory.
+	'''
+	assert shards > 0 and shards & (shards-1) == 0 and shards <= NUM_MASKS, 'Error, the number of shards must be a power of two.'
+	for table in tables:
+		assert table in dna.GENETIC_CODES, 'Error, %s is an invalid genetic code.' % table
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+	size = NUM_MASKS // shards
+	f = open(os.path.join(directory, 'plan.txt'), 'w')
+	f.write('#table start stop shard_file\n')
+	for table in tables:
+		for i in range(shards):
+			f.write('%s %s %s table%s_shard%05d.part\n' % (table, i*size, (i+1)*size, table, i))
+	f.close()
+
+
+def read_plan(directory):
+	'''
+	Read the plan file of a build directory.
+	Output is a list of (table, start, stop, shard file name) tuples, in the order of the file.
+	'''
+	plan = []
+	for line in open(os.path.join(directory, 'plan.txt')):
+		if line.strip() == '' or line.startswith('#'):
+			continue
+		table, start, stop, name = line.split()
+		plan.append((int(table), int(start), int(stop), name))
+	return plan
+
+
+def run_shard(directory, table, start, stop, name):
+	'''
+	Compute one shard of a plan and write its shard file.
+	The file is written under a temporary name and renamed when complete, so a shard file on disk is always a finished shard.
+	'''
+	space = codon_space.get_space(table)
+	path = os.path.join(directory, name)
+	f = open(path + '.tmp', 'wb')
+	f.write(make_header(space, start, stop))
+	f.write(compute_range(space, start, stop))
+	f.close()
+	os.rename(path + '.tmp', path)
+	return name
+
+
+def _run_shard(job):
+	'''
+	Unpack the arguments for run_shard() when it is called from the process pool.
+	'''
+	return run_shard(*job)
+
+
+def run_plan(directory, processes=None, shards=None):
+	'''
+	Compute the shards of a plan that do not have a shard file yet, using a pool of processes.
+	shards optionally limits the run to some shards, given by their line number (counting from 0) among the shards in the plan file.
+	Output is a list of the shard files that were written.
+	'''
+	plan = read_plan(directory)
+	if shards is not None:
+		plan = [plan[i] for i in shards]
+	jobs = [(directory,) + shard for shard in plan if not os.path.exists(os.path.join(directory, shard[3]))]
+	if processes == 1:
+		return [_run_shard(job) for job in jobs]
+	pool = multiprocessing.Pool(processes)
+	try:
+		return list(pool.imap_unordered(_run_shard, jobs))
+	finally:
+		pool.close()
+		pool.join()
+
+
+def merge(directory, table, path, checks=1000):
+	'''
+	Merge the shard files of one genetic code into a single answer file.
+	The shards must have been made with the codon table and codon exclusions in the current settings and together cover every amino acid mask.
+	After merging, a number of randomly chosen masks are searched again and compared with the answer file.
+	'''
+	space = codon_space.get_space(table)
+	shards = sorted([shard for shard in read_plan(directory) if shard[0] == table], key=lambda shard: shard[1])
+	assert len(shards) > 0, 'Error, the plan has no shards for genetic code %s.' % table
+
+	f = open(path + '.tmp', 'wb')
+	f.write(make_header(space))
+	expected = 0
+	for shard_table, start, stop, name in shards:
+		assert start == expected, 'Error, the shards of genetic code %s do not cover the amino acid masks from %s.' % (table, expected)
+		assert os.path.exists(os.path.join(directory, name)), 'Error, the shard %s has not been computed yet.' % name
+		data = open(os.path.join(directory, name), 'rb').read()
+		header, key, offset = read_header(data, name)
+		assert key == space.key, 'Error, the shard %s was made with another codon table or other codon exclusions than those in settings.txt.' % name
+		assert (header['start'], header['stop']) == (start, stop), 'Error, the shard %s does not hold the masks listed in the plan.' % name
+		f.write(data[offset:])
+		expected = stop
+	assert expected == NUM_MASKS, 'Error, the shards of genetic code %s do not cover the amino acid masks from %s.' % (table, expected)
+	f.close()
+
+	#check the merged file against the codon space
+	answer_file = AnswerFile(path + '.tmp')
+	for mask in [random.randrange(NUM_MASKS) for i in range(checks)]:
+		if mask & space.reachable:
+			index = space.best(mask)
+			expected = (index, space.offtarget(index, mask), space.codon_count[index])
+		else:
+			expected = (NO_TRIPLET, mask, 0)
+		assert answer_file.lookup(mask) == expected, 'Error, the merged answer for amino acid mask %s is wrong.' % mask
+	os.rename(path + '.tmp', path)
+
+
+
+if __name__ == '__main__':
+
+	#specify how to parse the arguments
+	import argparse
+	parser = argparse.ArgumentParser(description='Compute the best degenerate codon for every amino acid subset of a genetic code.')
+	subparsers = parser.add_subparsers(dest='command')
+
+	parser_build = subparsers.add_parser('build', help='compute one answer file in this process')
+	parser_build.add_argument('--table', default=1)
+	parser_build.add_argument('--out', required=True)
+
+	parser_plan = subparsers.add_parser('plan', help='write the shard plan for a sharded build')
+	parser_plan.add_argument('directory')
+	parser_plan.add_argument('--tables', nargs='*', help='genetic codes to build, all of them if left out')
+	parser_plan.add_argument('--shards', default=64, type=int, help='shards per genetic code, a power of two')
+
+	parser_run = subparsers.add_parser('run', help='compute the shards of a plan that are not done yet')
+	parser_run.add_argument('directory')
+	parser_run.add_argument('--processes', type=int)
+	parser_run.add_argument('--shards', nargs='*', type=int, help='only run these shards (line numbers among the shards in the plan, from 0)')
+
+	parser_merge = subparsers.add_parser('merge', help='merge and check the shards into one answer file per genetic code')
+	parser_merge.add_argument('directory')
+	parser_merge.add_argument('--checks', default=1000, type=int, help='number of random amino acid masks to check')
+	args = parser.parse_args()
+
+	if args.command == 'build':
+		build(int(args.table), args.out)
+
+	elif args.command == 'plan':
+		if args.tables == None:
+			tables = dna.GENETIC_CODES
+		else:
+			tables = [int(s) for s in args.tables]
+		write_plan(args.directory, tables, args.shards)
+
+	elif args.command == 'run':
+		for name in run_plan(args.directory, args.processes, args.shards):
+			print('done %s' % name)
+
+	elif args.command == 'merge':
+		for table in sorted(set([shard[0] for shard in read_plan(args.directory)])):
+			merge(args.directory, table, os.path.join(args.directory, 'table%s.ant' % table), args.checks)
+			print('merged table%s.ant' % table)
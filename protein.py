@@ -29,12 +29,22 @@
 #
 
 
+#the one letter codes of the canonical amino acids and the stop, in the order used throughout ANT
+CANONICAL = 'FLSYCWPHERIMTNKVADQG*'
+
+#the one letter codes of the non-canonical amino acids that user-defined genetic codes can use: U, and U1 to U9 written as the digits 1 to 9
+NONCANONICAL = 'U123456789'
+
+
+
 
 def one_to_three(one_letter):
 	'''
 	Convert a one letter code amino acid to a three letter code.
 	'''
-	assert one_letter.upper() in 'FLSYCWPHERIMTNKVADQG*U', 'Error, %s is not a valid amino acid' % one_letter
+	assert len(one_letter) == 1 and one_letter.upper() in CANONICAL + NONCANONICAL, 'Error, %s is not a valid amino acid' % one_letter
+	if one_letter in NONCANONICAL[1:]:
+		return 'Ua' + one_letter
 	
 	AA = {'I':'Ile',
 	'V':'Val',
@@ -65,7 +75,9 @@ def three_to_one(three_letter):
 	'''
 	Convert a three letter code amino acid to a one letter code.
 	'''
-	assert three_letter.upper() in ['ILE','VAL','LEU','PHE','CYS','MET','ALA','GLY','THR','TRP','SER','TYR','PRO','HIS','GLU','GLN','ASP','ASN','LYS','ARG','***', 'UAA'], 'Error, %s is not a valid amino acid' % three_letter
+	assert three_letter.upper() in ['ILE','VAL','LEU','PHE','CYS','MET','ALA','GLY','THR','TRP','SER','TYR','PRO','HIS','GLU','GLN','ASP','ASN','LYS','ARG','***', 'UAA'] + ['UA'+s for s in NONCANONICAL[1:]], 'Error, %s is not a valid amino acid' % three_letter
+	if three_letter[2] in NONCANONICAL[1:]:
+		return three_letter[2]
 
 	AA = {'ILE':'I',
 	'VAL':'V',
@@ -96,7 +108,9 @@ def one_to_full(one_letter):
 	'''
 	Convert one-letter amino acid code to full amino acid name.
 	'''
-	assert one_letter.upper() in 'FLSYCWPHERIMTNKVADQG*U', 'Error, %s is not a valid amino acid' % one_letter
+	assert len(one_letter) == 1 and one_letter.upper() in CANONICAL + NONCANONICAL, 'Error, %s is not a valid amino acid' % one_letter
+	if one_letter in NONCANONICAL[1:]:
+		return 'Unnatural AA ' + one_letter
 	AA = {'F':'Phenylalanine', 
 	'L':'Leucine', 
 	'S':'Serine', 
@@ -147,7 +161,9 @@ def full_to_one(full):
 							'aspartic acid', 
 							'glutamic acid', 
 							'glycine',
-							'unnatural aa'], 'Error, %s is not a valid amino acid' % full
+							'unnatural aa'] + ['unnatural aa '+s for s in NONCANONICAL[1:]], 'Error, %s is not a valid amino acid' % full
+	if full[-1] in NONCANONICAL[1:]:
+		return full[-1]
 
 	AA = {'phenylalanine':'F', 
 			'leucine':'L', 
@@ -191,9 +207,10 @@ def full_to_three(full):
 def count_aa(seq):
 	'''
 	Count occurrences of all amino acids in sequence. Return as dictionary.
+	The non-canonical amino acids U1 to U9 (the digits 1 to 9) only get a key when they occur in the sequence.
 	'''
 	seq = seq.upper()
-	assert all([s in 'IVLFCMAGTWSYPHEQDNKR*U' for s in seq]) is True, 'Error, unknown amino acids %s in sequence: %s' % (str([s for s in seq if s not in 'XIVLFCMAGTWSYPHEQDNKR*']), seq)
+	assert all([s in CANONICAL + NONCANONICAL for s in seq]) is True, 'Error, unknown amino acids %s in sequence: %s' % (str([s for s in seq if s not in CANONICAL + NONCANONICAL]), seq)
 	
 	AA = {'I':seq.count('I'),
 	'V':seq.count('V'),
@@ -217,4 +234,7 @@ def count_aa(seq):
 	'R':seq.count('R'),
 	'*':seq.count('*'),
 	'U':seq.count('U')}	
+	for s in NONCANONICAL[1:]:
+		if s in seq:
+			AA[s] = seq.count(s)
 	return AA
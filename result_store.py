@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+
+#The ambiguous nucleotide tool (ANT) is a free and open source tool aimed at
+#generating and analysing degenerate codons to support research in protein engineering, directed evolution and synthetic biology.
+
+#Copyright (C) 2015  Martin Engqvist |
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#LICENSE:
+#This file is part of ANT.
+#
+#ANT is free software; you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation; either version 3 of the License, or
+#(at your option) any later version.
+#
+#ANT is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU Library General Public License for more details.
+#
+#You should have received a copy of the GNU General Public License
+#along with this program; if not, write to the Free Software Foundation,
+#Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+#
+#Get source code at: https://github.com/mengqvist/ANT
+#
+
+
+
+#This file holds a persistent store for degenerate codon search results, kept in an SQLite database.
+#It lets separate runs and separate worker processes share results instead of recomputing them.
+
+import hashlib
+import os
+import sqlite3
+
+
+#bumped when the meaning of the stored results changes, which makes results stored by older versions stale
+FORMAT = 2
+
+
+class ResultStore:
+	'''
+	Class that keeps degenerate codon search results in an SQLite database file.
+	Pass the path of the database file when instantiating, it is created if it does not exist.
+
+	Results are keyed on the genetic code, a hash of the settings that affect the search
+	(the codon table, which for table 1001 comes from settings.txt, and the codon exclusion list) and the target amino acid mask.
+	Each result holds the best triplet index, the alternative triplet indices, all alternative triplet indices
+	and the amino acids that can be added without further off-targets, which is all a report needs.
+	When the settings for a genetic code change the results computed with the old settings are deleted.
+
+	Results for several genetic codes at once (codon_space.CombinedSpace) are not stored.
+
+	Several processes may use the same file at once. Each process opens its own connection
+	and SQLite serializes the writes, waiting up to timeout seconds for a lock.
+
+	To use a store for all DegenerateCodon objects:
+	ANT.result_cache.setStore(result_store.ResultStore('ant_cache.sqlite'))
+	'''
+	def __init__(self, path, timeout=30):
+		self.path = path
+		self.timeout = timeout
+		self.connection = None
+		self.pid = None
+		self.checked = set() #(table, settings hash) combinations which have been checked for stale results in this process
+
+
+	def connect(self):
+		'''
+		Open a connection to the database for the current process, creating the tables if needed.
+		A connection is not shared with forked worker processes, they open their own.
+		'''
+		if self.connection is not None and self.pid == os.getpid():
+			return self.connection
+		self.connection = sqlite3.connect(self.path, timeout=self.timeout)
+		self.pid = os.getpid()
+		self.checked = set()
+		self.connection.execute('PRAGMA journal_mode=WAL')
+		with self.connection:
+			self.connection.execute('CREATE TABLE IF NOT EXISTS settings (code INTEGER PRIMARY KEY, hash TEXT NOT NULL)')
+			self.connection.execute('CREATE TABLE IF NOT EXISTS results (code INTEGER, hash TEXT, target INTEGER, best INTEGER, alternatives TEXT, all_alternatives TEXT, possible INTEGER, PRIMARY KEY (code, hash, target))')
+		return self.connection
+
+
+	def settings_hash(self, space_key):
+		'''
+		Hash the part of a codon space key that comes from the settings: the codon table and the codon exclusion list, together with the format of the results.
+		'''
+		table, AAs, excluded = space_key
+		return hashlib.sha1(repr((FORMAT, AAs, tuple(excluded)))).hexdigest()
+
+
+	def invalidate(self, table, settings_hash):
+		'''
+		Delete the results for a genetic code that were computed with other settings than the current ones.
+		'''
+		connection = self.connect()
+		if (table, settings_hash) in self.checked:
+			return
+		with connection:
+			row = connection.execute('SELECT hash FROM settings WHERE code = ?', (table,)).fetchone()
+			if row is None or row[0] != settings_hash:
+				connection.execute('DELETE FROM results WHERE code = ? AND hash != ?', (table, settings_hash))
+				connection.execute('INSERT OR REPLACE INTO settings (code, hash) VALUES (?, ?)', (table, settings_hash))
+		self.checked.add((table, settings_hash))
+
+
+	def get(self, key):
+		'''
+		Retrieve the result for a (codon space key, amino acid mask) tuple.
+		Output is the result list, as used by ANT.ResultCache, or None if it is not stored.
+		'''
+		space_key, target = key
+		if type(space_key[0]) is not int:
+			return None
+		settings_hash = self.settings_hash(space_key)
+		self.invalidate(space_key[0], settings_hash)
+		row = self.connect().execute('SELECT best, alternatives, all_alternatives, possible FROM results WHERE code = ? AND hash = ? AND target = ?', (space_key[0], settings_hash, target)).fetchone()
+		if row is None:
+			return None
+		best, alternatives, all_alternatives, possible = row
+		return [best, self.to_list(alternatives), self.to_list(all_alternatives), possible]
+
+
+	def put(self, key, result):
+		'''
+		Store the result for a (codon space key, amino acid mask) tuple.
+		Parts of the result which are None do not overwrite what another process may already have stored.
+		'''
+		space_key, target = key
+		if type(space_key[0]) is not int:
+			return
+		settings_hash = self.settings_hash(space_key)
+		self.invalidate(space_key[0], settings_hash)
+		best, alternatives, all_alternatives, possible = result
+		connection = self.connect()
+		with connection:
+			connection.execute('INSERT OR IGNORE INTO results (code, hash, target, best) VALUES (?, ?, ?, ?)', (space_key[0], settings_hash, target, best))
+			connection.execute('UPDATE results SET alternatives = COALESCE(?, alternatives), all_alternatives = COALESCE(?, all_alternatives), possible = COALESCE(?, possible) WHERE code = ? AND hash = ? AND target = ?',
+								(self.to_text(alternatives), self.to_text(all_alternatives), possible, space_key[0], settings_hash, target))
+
+
+	def clear(self):
+		'''
+		Delete all stored results.
+		'''
+		connection = self.connect()
+		with connection:
+			connection.execute('DELETE FROM results')
+			connection.execute('DELETE FROM settings')
+		self.checked = set()
+
+
+	def to_text(self, indices):
+		'''
+		Convert a list of triplet indices to a comma-separated string, None stays None.
+		'''
+		if indices is None:
+			return None
+		return ','.join([str(i) for i in indices])
+
+
+	def to_list(self, text):
+		'''
+		Convert a comma-separated string of triplet indices back to a list, None stays None.
+		'''
+		if text is None:
+			return None
+		elif text == '':
+			return []
+		return [int(s) for s in text.split(',')]